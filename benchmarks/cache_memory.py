@@ -0,0 +1,105 @@
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+import discord
+from discord.state import ConnectionState
+
+from caching import PROFILES
+
+# Memory report for the cache profiles in caching.py.
+#
+#   python benchmarks/cache_memory.py [--guilds 1000] [--members 50] [--messages 20000]
+#
+# Feeds the same synthetic gateway payloads (guild creates, member chunks and
+# message creates) into a discord.py ConnectionState set up with each
+# profile's options and reports what stays allocated afterwards.
+
+TIMESTAMP = "2024-01-01T00:00:00.000000+00:00"
+
+def snowflake(rng):
+    return rng.randrange(10 ** 17, 2 ** 62)
+
+def user_payload(user_id):
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "avatar": None, "global_name": None}
+
+def member_payload(user_id, role_ids):
+    return {"user": user_payload(user_id), "roles": role_ids, "joined_at": TIMESTAMP, "deaf": False, "mute": False, "flags": 0}
+
+def synthetic_guild(rng, member_count):
+    guild_id = snowflake(rng)
+    roles = [{"id": str(guild_id), "name": "@everyone", "permissions": "0", "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False}]
+    roles += [{"id": str(snowflake(rng)), "name": f"role{i}", "permissions": "0", "position": i + 1, "color": 0, "hoist": False, "managed": False, "mentionable": False} for i in range(5)]
+    channels = [{"id": str(snowflake(rng)), "type": 0, "name": f"channel{i}", "position": i, "permission_overwrites": []} for i in range(10)]
+    role_ids = [role["id"] for role in roles[1:3]]
+    members = [member_payload(snowflake(rng), role_ids) for _ in range(member_count)]
+    return {
+        "id": str(guild_id), "name": f"guild{guild_id}", "roles": roles, "channels": channels, "emojis": [], "stickers": [],
+        "features": [], "member_count": member_count, "large": member_count > 250, "owner_id": members[0]["user"]["id"],
+        # Without the members intent Discord only sends a handful of members with the guild
+        "members": members[:5],
+    }, members
+
+def message_payload(rng, guild, member):
+    channel = rng.choice(guild["channels"])
+    return {
+        "id": str(snowflake(rng)), "channel_id": channel["id"], "guild_id": guild["id"], "author": member["user"],
+        "member": {key: value for key, value in member.items() if key != "user"}, "content": "!suggest " + "x" * rng.randrange(10, 200),
+        "timestamp": TIMESTAMP, "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+        "mention_roles": [], "attachments": [], "embeds": [], "pinned": False, "type": 0,
+    }
+
+def build_state(profile):
+    return ConnectionState(dispatch=lambda *args, **kwargs: None, handlers={}, hooks={}, http=None, **profile.client_options())
+
+def measure(profile, guilds, messages):
+    gc.collect()
+    tracemalloc.start()
+    state = build_state(profile)
+    for guild_data, members in guilds:
+        guild = state._add_guild_from_data(guild_data)
+        # A chunked guild ends up with its whole member list in the cache
+        if profile.chunk_guilds_at_startup:
+            for member in members:
+                guild._add_member(discord.Member(data=member, guild=guild, state=state))
+    for data in messages:
+        state.parse_message_create(data)
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    counts = {
+        "members": sum(len(guild._members) for guild in state.guilds),
+        "users": len(state._users),
+        "messages": len(state._messages) if state._messages is not None else 0,
+    }
+    return current, peak, counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the memory used by each cache profile")
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=50, help="members per guild")
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    guilds = [synthetic_guild(rng, args.members) for _ in range(args.guilds)]
+    messages = []
+    for _ in range(args.messages):
+        guild_data, members = rng.choice(guilds)
+        messages.append(message_payload(rng, guild_data, rng.choice(members)))
+
+    print(f"{args.guilds} guilds, {args.members} members each, {args.messages} messages")
+    print(f"{'profile':12} {'retained MiB':>13} {'peak MiB':>9} {'members':>8} {'users':>7} {'messages':>9}")
+    for name, make_profile in PROFILES.items():
+        current, peak, counts = measure(make_profile(), guilds, messages)
+        print(f"{name:12} {current / 2 ** 20:>13.1f} {peak / 2 ** 20:>9.1f} {counts['members']:>8} {counts['users']:>7} {counts['messages']:>9}")
+
+if __name__ == "__main__":
+    main()
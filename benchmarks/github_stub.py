@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+
+from aiohttp import web
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from github_client import GitHubClient
+
+# Local stand-in for the parts of the GitHub API the bot uses, and checks of
+# GitHubClient's ETag, rate-limit and retry paths against it.
+#
+#   python benchmarks/github_stub.py                 run the checks, exits 1 if one fails
+#   python benchmarks/github_stub.py --serve [--port 8081]
+#                                                    serve the stub, point the bot at it with
+#                                                    GITHUB_API_URL=http://127.0.0.1:8081
+#
+# The repository name picks how the stub behaves:
+#   <owner>/etag       always 200 with an ETag, 304 when If-None-Match matches
+#   <owner>/ratelimit  the first request is rate limited for a second
+#   <owner>/flaky      the first two requests fail with a 502
+#   <owner>/down       every request fails with a 503
+#   <owner>/slow       answers after two seconds
+# Any other name behaves like etag.
+
+COMMITS = [{"sha": hashlib.sha1(str(n).encode()).hexdigest(), "commit": {"message": f"Commit {n}"}} for n in range(3)]
+
+class GitHubStub:
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self.port = port
+        self.requests = {}  # scenario -> requests received
+        self.contents = {}  # (repo, path) -> {"content": ..., "sha": ...}
+        self._runner = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _count(self, scenario):
+        self.requests[scenario] = self.requests.get(scenario, 0) + 1
+        return self.requests[scenario]
+
+    async def commits(self, request):
+        scenario = request.match_info["repo"]
+        count = self._count(scenario)
+        if scenario == "ratelimit" and count == 1:
+            return web.json_response({"message": "API rate limit exceeded"}, status=403, headers={
+                "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()) + 1)})
+        if scenario == "flaky" and count <= 2:
+            return web.json_response({"message": "Bad gateway"}, status=502)
+        if scenario == "down":
+            return web.json_response({"message": "Unavailable"}, status=503)
+        if scenario == "slow":
+            await asyncio.sleep(2)
+
+        body = json.dumps(COMMITS)
+        etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+        headers = {"ETag": etag, "X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(int(time.time()) + 3600)}
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=body, content_type="application/json", headers=headers)
+
+    async def get_contents(self, request):
+        key = (request.match_info["repo"], request.match_info["path"])
+        if key not in self.contents:
+            return web.json_response({"message": "Not Found"}, status=404)
+        return web.json_response(self.contents[key])
+
+    async def put_contents(self, request):
+        data = await request.json()
+        key = (request.match_info["repo"], request.match_info["path"])
+        current = self.contents.get(key)
+        if current is not None and data.get("sha") != current["sha"]:
+            return web.json_response({"message": "sha does not match"}, status=409)
+        sha = hashlib.sha1(data["content"].encode()).hexdigest()
+        self.contents[key] = {"content": data["content"], "sha": sha}
+        return web.json_response({"content": {"sha": sha}}, status=200 if current else 201)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/repos/{owner}/{repo}/commits", self.commits)
+        app.router.add_get("/repos/{owner}/{repo}/contents/{path:.+}", self.get_contents)
+        app.router.add_put("/repos/{owner}/{repo}/contents/{path:.+}", self.put_contents)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]  # the port picked when 0 was asked for
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+# Checks, each returns a list of problems
+async def check_etag(stub):
+    client = GitHubClient(base_url=stub.base_url)
+    try:
+        first = await client.get_commits("stub/etag")
+        second = await client.get_commits("stub/etag")
+    finally:
+        await client.close()
+    problems = []
+    if first.status != 200 or first.data != COMMITS or first.not_modified:
+        problems.append(f"first request: {first.status}, not_modified={first.not_modified}")
+    if not second.not_modified or second.data != COMMITS:
+        problems.append(f"second request was not answered from the ETag cache ({second.status})")
+    if client.rate_limit_remaining != 4999:
+        problems.append(f"rate limit not read from the headers: {client.rate_limit_remaining}")
+    return problems
+
+async def check_rate_limit(stub):
+    client = GitHubClient(base_url=stub.base_url)
+    start = time.perf_counter()
+    try:
+        response = await client.get_commits("stub/ratelimit")
+    finally:
+        await client.close()
+    waited = time.perf_counter() - start
+    problems = []
+    if response.status != 200:
+        problems.append(f"expected a 200 after waiting out the limit, got {response.status}")
+    if stub.requests.get("ratelimit") != 2:
+        problems.append(f"expected 2 requests, the stub saw {stub.requests.get('ratelimit')}")
+    if waited < 0.5:
+        problems.append(f"retried after {waited:.2f}s without waiting for the reset")
+    return problems
+
+async def check_retry(stub):
+    client = GitHubClient(base_url=stub.base_url)
+    try:
+        response = await client.get_commits("stub/flaky")
+    finally:
+        await client.close()
+    problems = []
+    if response.status != 200 or response.data != COMMITS:
+        problems.append(f"expected a 200 after two 502s, got {response.status}")
+    if stub.requests.get("flaky") != 3:
+        problems.append(f"expected 3 requests, the stub saw {stub.requests.get('flaky')}")
+    return problems
+
+async def check_give_up(stub):
+    client = GitHubClient(base_url=stub.base_url, max_retries=1)
+    try:
+        response = await client.get_commits("stub/down")
+    finally:
+        await client.close()
+    problems = []
+    if response.status != 503 or response.ok:
+        problems.append(f"expected the final 503, got {response.status}")
+    if stub.requests.get("down") != 2:
+        problems.append(f"expected 2 requests with max_retries=1, the stub saw {stub.requests.get('down')}")
+    return problems
+
+async def check_timeout(stub):
+    client = GitHubClient(base_url=stub.base_url, timeout=0.5, max_retries=1)
+    try:
+        response = await client.get_commits("stub/slow")
+    finally:
+        await client.close()
+    problems = []
+    if response.status != 0 or "Timeout" not in response.text:
+        problems.append(f"expected a timeout (status 0), got {response.status} {response.text!r}")
+    return problems
+
+async def check_contents(stub):
+    client = GitHubClient(base_url=stub.base_url)
+    try:
+        missing = await client.get_contents("stub/docs", "commands.md")
+        created = await client.put_contents("stub/docs", "commands.md", "aGVsbG8=", "Create docs")
+        stale = await client.put_contents("stub/docs", "commands.md", "d29ybGQ=", "Update docs", sha="0" * 40)
+        current = await client.get_contents("stub/docs", "commands.md")
+        updated = await client.put_contents("stub/docs", "commands.md", "d29ybGQ=", "Update docs", sha=current.data["sha"])
+    finally:
+        await client.close()
+    problems = []
+    for name, response, status in (("missing", missing, 404), ("create", created, 201), ("stale sha", stale, 409), ("update", updated, 200)):
+        if response.status != status:
+            problems.append(f"{name}: expected {status}, got {response.status}")
+    return problems
+
+CHECKS = (check_etag, check_rate_limit, check_retry, check_give_up, check_timeout, check_contents)
+
+async def run_checks():
+    failed = 0
+    for check in CHECKS:
+        stub = GitHubStub()
+        await stub.start()
+        start = time.perf_counter()
+        try:
+            problems = await check(stub)
+        finally:
+            await stub.stop()
+        name = check.__name__[len("check_"):]
+        if problems:
+            failed += 1
+            print(f"FAIL {name} ({time.perf_counter() - start:.2f}s)")
+            for problem in problems:
+                print(f"  - {problem}")
+        else:
+            print(f"ok   {name} ({time.perf_counter() - start:.2f}s)")
+    return failed
+
+async def serve(port):
+    stub = GitHubStub(port=port)
+    await stub.start()
+    print(f"GitHub stub listening on {stub.base_url}, set GITHUB_API_URL to it")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stub.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local GitHub API stand-in and checks for GitHubClient")
+    parser.add_argument("--serve", action="store_true", help="only serve the stub until interrupted")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    if args.serve:
+        try:
+            asyncio.run(serve(args.port))
+        except KeyboardInterrupt:
+            pass
+        return
+    failed = asyncio.run(run_checks())
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
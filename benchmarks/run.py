@@ -0,0 +1,337 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+sys.path.insert(0, SRC_DIR)
+
+from storage import JsonStorage, SqliteStorage, JournalStorage
+from settings_cache import GuildSettingsCache, default_guild_settings
+from membership import MembershipRegistry
+from suggestions import SuggestionStore
+from permissions import PermissionIndex
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BACKENDS = ("json", "sqlite", "journal")
+
+# Offline benchmarks for the storage helpers and command handlers.
+#
+#   python benchmarks/run.py [--sizes 10,1000,10000,100000] [--backends json,sqlite,journal]
+#                            [--iterations 200] [--save-baseline] [--compare] [--tolerance 0.25]
+#
+# Every run builds a synthetic dataset in a temporary directory, so nothing
+# touches database/ and no network access is needed.
+
+# Synthetic data
+def snowflake(rng):
+    return rng.randrange(10 ** 17, 2 ** 62)
+
+def synthetic_guild(rng):
+    settings = default_guild_settings()
+    for key in settings:
+        if rng.random() < 0.5:
+            settings[key] = snowflake(rng)
+    return settings
+
+def make_storage(backend, directory):
+    if backend == "json":
+        return JsonStorage(
+            settings_dir=os.path.join(directory, "guilds"),
+            staff_file=os.path.join(directory, "data.json"),
+            vip_file=os.path.join(directory, "vipdata.json"),
+            appeals_file=os.path.join(directory, "appeals.json"),
+        )
+    if backend == "sqlite":
+        return SqliteStorage(os.path.join(directory, "divine.db"))
+    if backend == "journal":
+        return JournalStorage(os.path.join(directory, "journal"), compact_every=10 ** 9)
+    raise ValueError(f"Unknown backend: {backend}")
+
+def populate(storage, size, rng):
+    guild_ids = [str(snowflake(rng)) for _ in range(size)]
+    for start in range(0, size, 1000):
+        storage.save_guilds({guild_id: synthetic_guild(rng) for guild_id in guild_ids[start:start + 1000]})
+    # Staff, VIP and appeal lists grow with the number of guilds, but much slower
+    people = max(size // 100, 5)
+    storage.save_staff([snowflake(rng) for _ in range(people)])
+    storage.save_vips([snowflake(rng) for _ in range(people)])
+    for _ in range(people):
+        storage.save_appeal(snowflake(rng), snowflake(rng))
+    return guild_ids
+
+# Fake Discord objects, just enough for the handlers
+class FakeAsset:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+class FakeMessage:
+    _ids = iter(range(1, 10 ** 12))
+
+    def __init__(self, channel):
+        self.id = next(FakeMessage._ids)
+        self.channel = channel
+
+    async def add_reaction(self, emoji):
+        pass
+
+    async def edit(self, **fields):
+        return self
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+
+    async def send(self, *args, **kwargs):
+        return FakeMessage(self)
+
+class FakePermissions:
+    administrator = False
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+        self.permissions = FakePermissions()
+
+    def is_default(self):
+        return True
+
+class FakeMember:
+    def __init__(self, user_id, guild=None):
+        self.id = user_id
+        self.guild = guild
+        self.name = f"user{user_id}"
+        self.avatar = FakeAsset()
+        self.display_avatar = self.avatar
+        self.roles = []
+
+    def get_role(self, role_id):
+        return None
+
+    def __str__(self):
+        return self.name
+
+# Owned by the member running the commands, so the admin checks pass
+class FakeGuild:
+    def __init__(self, guild_id, owner_id, channels):
+        self.id = int(guild_id)
+        self.owner_id = owner_id
+        self.name = f"guild{guild_id}"
+        self.default_role = FakeRole(self.id)
+        self.roles = [self.default_role]
+        self.channels = {channel.id: channel for channel in channels}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id):
+        return self.default_role if role_id == self.id else None
+
+    async def resolve_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+class FakeContext:
+    def __init__(self, guild, author, channel):
+        self.guild = guild
+        self.author = author
+        self.channel = channel
+
+    async def send(self, *args, **kwargs):
+        return FakeMessage(self.channel)
+
+    async def reply(self, *args, **kwargs):
+        return FakeMessage(self.channel)
+
+class FakeBot:
+    def __init__(self, storage, directory):
+        self.storage = storage
+        self.suggestions = SuggestionStore(os.path.join(directory, "suggestions.db"))
+        self.guild_settings = GuildSettingsCache(storage.load_guild, storage.save_guilds, max_size=1000)
+        self.permissions = PermissionIndex(self.guild_settings)
+        self.guild_settings.subscribe(self.permissions.invalidate)
+        self.vips = MembershipRegistry(storage.load_vips, lambda: storage.stamp("vips"))
+        self.staff = MembershipRegistry(storage.load_staff, lambda: storage.stamp("staff"))
+        self.channels = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    async def resolve_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+# Measurement
+def summarize(samples, elapsed):
+    ordered = sorted(samples)
+    return {
+        "ops": len(samples),
+        "throughput": len(samples) / elapsed if elapsed else float("inf"),
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+    }
+
+def measure(func, iterations):
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        step = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - step)
+    return summarize(samples, time.perf_counter() - start)
+
+async def measure_async(func, iterations):
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        step = time.perf_counter()
+        await func(i)
+        samples.append(time.perf_counter() - step)
+    return summarize(samples, time.perf_counter() - start)
+
+def storage_benchmarks(bot, guild_ids, rng, iterations):
+    cache = bot.guild_settings
+    picks = [rng.choice(guild_ids) for _ in range(iterations)]
+    results = {}
+
+    # A cold read goes to the backend, a warm one is served from the cache
+    results["load_guild_settings (cold)"] = measure(lambda i: (cache.discard(picks[i]), cache.get(picks[i])), iterations)
+    results["load_guild_settings (warm)"] = measure(lambda i: cache.get(picks[i]), iterations)
+
+    def save(i):
+        cache.set(picks[i], synthetic_guild(rng))
+        cache.flush()
+    results["save_guild_settings (+flush)"] = measure(save, iterations)
+    results["load_vip_data"] = measure(lambda i: bot.storage.load_vips(), iterations)
+    results["save_appeal"] = measure(lambda i: bot.storage.save_appeal(snowflake(rng), snowflake(rng)), iterations)
+    return results
+
+def patch_converters(bot):
+    # The real converters look things up through discord.py's state, resolve from the fake guild instead
+    from discord.ext import commands
+
+    async def convert_channel(self, ctx, argument):
+        return ctx.guild.get_channel(int(argument.strip("<#>")))
+
+    commands.TextChannelConverter.convert = convert_channel
+
+async def handler_benchmarks(bot, guild_ids, rng, iterations):
+    from cogs.guilds import Guilds
+    from cogs.owner import Owner
+    from cogs.suggestions import Suggestions
+
+    patch_converters(bot)
+    guilds_cog = Guilds(bot)
+    owner_cog = Owner(bot)
+    suggestions_cog = Suggestions(bot)
+    bot.vips.refresh()
+
+    contexts = []
+    for i in range(iterations):
+        channel = FakeChannel(snowflake(rng))
+        suggestions = FakeChannel(snowflake(rng))
+        bot.channels[suggestions.id] = suggestions
+        owner_id = snowflake(rng)
+        guild = FakeGuild(rng.choice(guild_ids), owner_id, [channel, suggestions])
+        contexts.append((FakeContext(guild, FakeMember(owner_id, guild), channel), suggestions))
+
+    results = {}
+
+    async def setup(i):
+        ctx, suggestions = contexts[i]
+        await guilds_cog.setup.callback(guilds_cog, ctx, "suggestions", value=suggestions.mention)
+    results["!setup suggestions"] = await measure_async(setup, iterations)
+
+    async def suggest(i):
+        ctx, _ = contexts[i]
+        await suggestions_cog.suggest.callback(suggestions_cog, ctx, suggestion="Add more benchmarks")
+    results["!suggest"] = await measure_async(suggest, iterations)
+
+    async def addvip(i):
+        ctx, _ = contexts[i]
+        await owner_cog.addvip.callback(owner_cog, ctx, FakeMember(snowflake(rng)))
+    results["!addvip"] = await measure_async(addvip, iterations)
+
+    bot.guild_settings.flush()
+    return results
+
+def run_backend(backend, size, iterations, seed):
+    rng = random.Random(seed)
+    directory = tempfile.mkdtemp(prefix=f"divine-bench-{backend}-")
+    try:
+        storage = make_storage(backend, directory)
+        start = time.perf_counter()
+        guild_ids = populate(storage, size, rng)
+        print(f"  built {size} guilds in {time.perf_counter() - start:.2f}s")
+        bot = FakeBot(storage, directory)
+
+        results = storage_benchmarks(bot, guild_ids, rng, iterations)
+        try:
+            results.update(asyncio.run(handler_benchmarks(bot, guild_ids, rng, iterations)))
+        except ImportError as e:
+            print(f"  skipping command handlers, {e}")
+        storage.close()
+        bot.suggestions.close()
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+def print_results(results, baseline, tolerance):
+    regressions = []
+    print(f"  {'benchmark':32} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, result in results.items():
+        line = f"  {name:32} {result['throughput']:>10.0f} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f}"
+        previous = baseline.get(name) if baseline else None
+        if previous:
+            change = result["p50_ms"] / previous["p50_ms"] - 1 if previous["p50_ms"] else 0
+            line += f"  {change:+.0%} vs baseline"
+            if change > tolerance:
+                line += "  REGRESSION"
+                regressions.append(name)
+        print(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for storage helpers and command handlers")
+    parser.add_argument("--sizes", default="10,1000,10000", help="comma separated guild counts, up to 100000")
+    parser.add_argument("--backends", default=",".join(BACKENDS))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to {os.path.basename(BASELINE_FILE)}")
+    parser.add_argument("--compare", action="store_true", help="compare p50 latency against the saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="p50 slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        if not os.path.exists(BASELINE_FILE):
+            print("No baseline saved yet, run with --save-baseline first.")
+            sys.exit(1)
+        with open(BASELINE_FILE, 'r') as f:
+            baseline = json.load(f)
+
+    all_results = {}
+    regressions = []
+    for backend in args.backends.split(","):
+        for size in map(int, args.sizes.split(",")):
+            key = f"{backend}/{size}"
+            print(f"{key}:")
+            results = run_backend(backend, size, args.iterations, args.seed)
+            all_results[key] = results
+            regressions += [f"{key} {name}" for name in print_results(results, baseline.get(key), args.tolerance)]
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(all_results, f, indent=4)
+        print(f"Saved baseline to {BASELINE_FILE}")
+    if regressions:
+        print(f"{len(regressions)} regressions: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+
+import discord
+
+# What the gateway sends and what discord.py keeps in memory, picked with CACHE_PROFILE:
+#
+#   default     Intents.default() plus message content, discord.py's own member and
+#               message caches. Memory grows with the members and messages the bot sees.
+#   low_memory  Only the intents the commands use (guilds, messages, reactions), no member
+#               cache, no message cache and no chunking. Channels and users that aren't
+#               cached are fetched when a handler needs them, see DivineBot.resolve_channel.
+#   full        default plus the privileged members intent, every member cached and guilds
+#               chunked at startup. Needed for member join events (the welcomer), costs the most.
+#
+# CACHE_MAX_MESSAGES (0 turns the message cache off) and CACHE_CHUNK_GUILDS override
+# the profile's values.
+class CacheProfile:
+    def __init__(self, name, intents, member_cache_flags=None, max_messages=1000, chunk_guilds_at_startup=None):
+        self.name = name
+        self.intents = intents
+        self.member_cache_flags = discord.MemberCacheFlags.from_intents(intents) if member_cache_flags is None else member_cache_flags
+        self.max_messages = max_messages
+        # Chunking needs the members intent, without it there is nothing to chunk
+        self.chunk_guilds_at_startup = intents.members if chunk_guilds_at_startup is None else chunk_guilds_at_startup and intents.members
+
+    @classmethod
+    def from_env(cls):
+        name = os.getenv("CACHE_PROFILE", "default").lower()
+        if name not in PROFILES:
+            raise ValueError(f"Unknown cache profile: {name}, use one of {', '.join(PROFILES)}")
+        profile = PROFILES[name]()
+
+        max_messages = os.getenv("CACHE_MAX_MESSAGES")
+        if max_messages is not None:
+            profile.max_messages = int(max_messages) or None
+        chunk_guilds = os.getenv("CACHE_CHUNK_GUILDS")
+        if chunk_guilds is not None:
+            profile.chunk_guilds_at_startup = chunk_guilds.lower() in ("1", "true", "yes") and profile.intents.members
+        return profile
+
+    # With slash commands only, message events are no longer needed at all
+    def disable_message_events(self):
+        self.intents.message_content = False
+        self.intents.guild_messages = False
+        self.intents.dm_messages = False
+        self.max_messages = None
+
+    # Keyword arguments for the bot's constructor
+    def client_options(self):
+        return {
+            "intents": self.intents,
+            "member_cache_flags": self.member_cache_flags,
+            "max_messages": self.max_messages,
+            "chunk_guilds_at_startup": self.chunk_guilds_at_startup,
+        }
+
+    def describe(self):
+        members = ", ".join(name for name, enabled in self.member_cache_flags if enabled) or "none"
+        messages = self.max_messages if self.max_messages is not None else "off"
+        return f"{self.name} (members cached: {members}, messages cached: {messages}, chunking: {'on' if self.chunk_guilds_at_startup else 'off'})"
+
+def default_profile():
+    intents = discord.Intents.default()
+    intents.message_content = True
+    return CacheProfile("default", intents)
+
+def low_memory_profile():
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.dm_messages = True
+    intents.guild_reactions = True  # suggestion votes
+    intents.message_content = True
+    return CacheProfile("low_memory", intents, member_cache_flags=discord.MemberCacheFlags.none(), max_messages=None, chunk_guilds_at_startup=False)
+
+def full_profile():
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.members = True
+    return CacheProfile("full", intents, member_cache_flags=discord.MemberCacheFlags.all(), chunk_guilds_at_startup=True)
+
+PROFILES = {
+    "default": default_profile,
+    "low_memory": low_memory_profile,
+    "full": full_profile,
+}
@@ -0,0 +1,283 @@
+import asyncio
+import itertools
+import json
+import os
+import sys
+
+CLUSTER_IPC_HOST = "127.0.0.1"
+CLUSTER_IPC_PORT = 8765
+# Seconds between attempts to reach the hub again, doubled up to the maximum
+CLUSTER_RECONNECT_DELAY = 1
+CLUSTER_RECONNECT_MAX_DELAY = 30
+
+# Function to find which shard Discord routes a guild's events to
+def shard_for_guild(guild_id, shard_count):
+    return (int(guild_id) >> 22) % shard_count
+
+# Function to split shard_count shards into contiguous ranges, one per worker
+def shard_ranges(shard_count, workers):
+    return [list(range(i * shard_count // workers, (i + 1) * shard_count // workers)) for i in range(workers)]
+
+# Shard layout of this process, read from the environment:
+#
+#   SHARD_COUNT       total shards, unset lets Discord recommend a count
+#   CLUSTER_WORKERS   number of worker processes (set by the launcher)
+#   CLUSTER_ID        index of this worker (set by the launcher)
+#   CLUSTER_SHARDS    comma separated shard IDs this worker runs (set by the launcher)
+#   CLUSTER_IPC_PORT  local port of the launcher's IPC hub
+class ClusterConfig:
+    def __init__(self, shard_count=None, shard_ids=None, cluster_id=0, workers=1, ipc_port=CLUSTER_IPC_PORT):
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+        self.cluster_id = cluster_id
+        self.workers = workers
+        self.ipc_port = ipc_port
+
+    @classmethod
+    def from_env(cls):
+        shard_count = os.getenv("SHARD_COUNT")
+        shard_ids = os.getenv("CLUSTER_SHARDS")
+        return cls(
+            shard_count=int(shard_count) if shard_count else None,
+            shard_ids=[int(i) for i in shard_ids.split(",")] if shard_ids else None,
+            cluster_id=int(os.getenv("CLUSTER_ID", "0")),
+            workers=int(os.getenv("CLUSTER_WORKERS", "1")),
+            ipc_port=int(os.getenv("CLUSTER_IPC_PORT", str(CLUSTER_IPC_PORT))),
+        )
+
+    @property
+    def multi_process(self):
+        return self.workers > 1
+
+    @property
+    def is_primary(self):
+        # Only one worker listens for webhooks, polls GitHub and publishes docs
+        return self.cluster_id == 0
+
+    def owns_guild(self, guild_id):
+        if self.shard_ids is None or self.shard_count is None:
+            return True
+        return shard_for_guild(guild_id, self.shard_count) in self.shard_ids
+
+async def _send(writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+# Worker side of the IPC channel.
+#
+# Handlers are named coroutines that answer for this process only (its guild
+# count, its servers). gather() runs a handler on every worker through the
+# launcher's hub and returns one result per worker. Without a hub, in a
+# single process, it just runs the local handler.
+#
+# When the hub connection drops, waiting requests fail with ConnectionError
+# and the client keeps reconnecting with backoff. Until it is back, gather()
+# raises instead of quietly answering for this worker alone.
+class ClusterClient:
+    def __init__(self, config, timeout=10):
+        self.config = config
+        self.timeout = timeout
+        self.handlers = {}
+        self._reader = None
+        self._writer = None
+        self._pending = {}  # request id -> future
+        self._ids = itertools.count(1)
+        self._task = None
+
+    def register(self, method, handler):
+        self.handlers[method] = handler
+
+    @property
+    def connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _call_local(self, method, args):
+        return await self.handlers[method](*args)
+
+    async def gather(self, method, *args):
+        if not self.config.multi_process:
+            return [await self._call_local(method, args)]
+        if not self.connected:
+            raise ConnectionError("Not connected to the cluster IPC hub")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await _send(self._writer, {"type": "request", "id": request_id, "method": method, "args": list(args)})
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def start(self):
+        if not self.config.multi_process or self._task is not None:
+            return
+        # The first connection has to work, startup retries this phase otherwise
+        await self._connect()
+        self._task = asyncio.create_task(self._run())
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(CLUSTER_IPC_HOST, self.config.ipc_port)
+        await _send(self._writer, {"type": "hello", "cluster": self.config.cluster_id})
+
+    async def _run(self):
+        while True:
+            try:
+                await self._listen()
+            except (ConnectionError, ValueError) as e:
+                print(f"Cluster IPC connection failed: {e}")
+            self._disconnected()
+            print("Lost the connection to the cluster IPC hub, reconnecting.")
+
+            delay = CLUSTER_RECONNECT_DELAY
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    await self._connect()
+                except OSError as e:
+                    delay = min(delay * 2, CLUSTER_RECONNECT_MAX_DELAY)
+                    print(f"Cluster IPC hub still unreachable ({e}), retrying in {delay}s")
+                    continue
+                print("Reconnected to the cluster IPC hub.")
+                break
+
+    async def _listen(self):
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if message["type"] == "call":
+                asyncio.create_task(self._answer(message))
+            elif message["type"] == "response":
+                future = self._pending.get(message["id"])
+                if future is not None and not future.done():
+                    future.set_result(message["results"])
+
+    def _disconnected(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        # Nobody will answer these any more, don't make the callers wait for the timeout
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Lost the connection to the cluster IPC hub"))
+
+    async def _answer(self, message):
+        try:
+            result = await self._call_local(message["method"], message.get("args", []))
+            reply = {"type": "reply", "id": message["id"], "result": result}
+        except Exception as e:
+            reply = {"type": "reply", "id": message["id"], "error": str(e)}
+        if self.connected:
+            try:
+                await _send(self._writer, reply)
+            except ConnectionError:
+                pass  # the hub went away, _run reconnects
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+# Launcher side of the IPC channel. A request from one worker is fanned out
+# as a call to every connected worker and the replies go back as one list.
+class IPCHub:
+    def __init__(self, port=CLUSTER_IPC_PORT, timeout=10):
+        self.port = port
+        self.timeout = timeout
+        self.workers = {}  # cluster id -> writer
+        self._calls = {}  # call id -> {cluster id: future}
+        self._ids = itertools.count(1)
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, CLUSTER_IPC_HOST, self.port)
+
+    async def _handle(self, reader, writer):
+        cluster_id = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message["type"] == "hello":
+                    cluster_id = message["cluster"]
+                    self.workers[cluster_id] = writer
+                elif message["type"] == "request":
+                    asyncio.create_task(self._fan_out(writer, message))
+                elif message["type"] == "reply":
+                    future = self._calls.get(message["id"], {}).get(cluster_id)
+                    if future is not None and not future.done():
+                        future.set_result(message)
+        finally:
+            if cluster_id is not None and self.workers.get(cluster_id) is writer:
+                del self.workers[cluster_id]
+            writer.close()
+
+    async def _fan_out(self, requester, message):
+        call_id = next(self._ids)
+        loop = asyncio.get_running_loop()
+        futures = {cluster_id: loop.create_future() for cluster_id in self.workers}
+        self._calls[call_id] = futures
+        call = {"type": "call", "id": call_id, "method": message["method"], "args": message.get("args", [])}
+        try:
+            for cluster_id, writer in list(self.workers.items()):
+                await _send(writer, call)
+            done = set()
+            if futures:
+                done, _ = await asyncio.wait(futures.values(), timeout=self.timeout)
+        finally:
+            del self._calls[call_id]
+
+        # Workers that errored or didn't answer in time are left out of the results
+        results = []
+        for cluster_id in sorted(futures):
+            future = futures[cluster_id]
+            if future in done and "error" not in future.result():
+                results.append(future.result()["result"])
+        await _send(requester, {"type": "response", "id": message["id"], "results": results})
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+# Launcher: python src/cluster.py
+# Runs the IPC hub and CLUSTER_WORKERS copies of bot.py, each owning a
+# contiguous range of SHARD_COUNT shards, and restarts a worker if it dies.
+async def run_cluster(workers, shard_count, ipc_port=CLUSTER_IPC_PORT, restart_delay=5):
+    if shard_count < workers:
+        raise ValueError("SHARD_COUNT must be at least CLUSTER_WORKERS")
+    hub = IPCHub(ipc_port)
+    await hub.start()
+    bot_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py")
+
+    async def supervise(cluster_id, shard_ids):
+        env = dict(os.environ, SHARD_COUNT=str(shard_count), CLUSTER_WORKERS=str(workers), CLUSTER_ID=str(cluster_id),
+                   CLUSTER_SHARDS=",".join(map(str, shard_ids)), CLUSTER_IPC_PORT=str(ipc_port))
+        while True:
+            print(f"Starting cluster {cluster_id} with shards {shard_ids[0]}-{shard_ids[-1]}")
+            process = await asyncio.create_subprocess_exec(sys.executable, bot_path, env=env)
+            code = await process.wait()
+            print(f"Cluster {cluster_id} exited with code {code}, restarting in {restart_delay}s")
+            await asyncio.sleep(restart_delay)
+
+    try:
+        await asyncio.gather(*(supervise(i, shards) for i, shards in enumerate(shard_ranges(shard_count, workers))))
+    finally:
+        await hub.close()
+
+if __name__ == "__main__":
+    config = ClusterConfig.from_env()
+    workers = int(os.getenv("CLUSTER_WORKERS", "2"))
+    if config.shard_count is None:
+        print("Set SHARD_COUNT to run in cluster mode.")
+        sys.exit(1)
+    try:
+        asyncio.run(run_cluster(workers, config.shard_count, config.ipc_port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,2 @@
+# Command modules, each one is loaded as a discord.py extension and can be
+# reloaded in place without restarting the bot.
@@ -0,0 +1,182 @@
+import discord
+from discord.ext import commands
+import asyncio
+import json
+
+OWNER_ID = 898255050592366642  # Replace with your actual bot owner ID
+APPEAL_PANEL_CHANNEL_ID = 1293591350524121172  # Replace with the ID of the channel you want to send the appeal panel to
+APPEAL_PANEL_STATE_FILE = "database/appeal_panel.json"
+
+# Stable custom_ids, Discord sends them back with every click so the buttons keep working across restarts
+OPEN_APPEAL_ID = "divine:appeal:open"
+CLOSE_APPEAL_ID = "divine:appeal:close"
+
+# How far back to look for an old panel when its message ID isn't known
+PANEL_SEARCH_LIMIT = 25
+
+def appeal_panel_embed():
+    embed = discord.Embed(
+        title="🔔 Appeal Panel",
+        description="If you would like to submit an appeal, please click the 'Open Appeal' button below.\n\n✉️ Your appeal will be reviewed promptly.",
+        color=discord.Color.blue()
+    )
+    embed.set_footer(text="We appreciate your patience during this process.")
+    return embed
+
+class AppealForm(discord.ui.Modal, title="Appeal Form"):
+    appeal_type = discord.ui.TextInput(label="Appeal type", placeholder="Server ban, punishment appeal, etc.", style=discord.TextStyle.short)
+    reason = discord.ui.TextInput(label="Reason for appeal", placeholder="Explain why you're appealing", style=discord.TextStyle.paragraph)
+    additional_info = discord.ui.TextInput(label="Additional information", placeholder="Any other relevant details", style=discord.TextStyle.paragraph)
+
+    def __init__(self, bot):
+        super().__init__()
+        self.bot = bot
+
+    async def on_submit(self, interaction: discord.Interaction):
+        # Every appeal creates a channel, answer an over-eager user without making one
+        rejection = self.bot.throttle.hit("appeal", interaction.user.id, interaction.guild_id)
+        if rejection is not None:
+            await interaction.response.send_message(f"You've submitted an appeal recently, try again in {rejection.retry_after:.0f}s.", ephemeral=True)
+            return
+
+        appeal_channel = await interaction.guild.create_text_channel(f"appeal-{interaction.user.name}")
+
+        # Send an embed to the new appeal channel
+        appeal_details_embed = discord.Embed(
+            title="📋 New Appeal Submitted",
+            color=discord.Color.green()
+        )
+        appeal_details_embed.add_field(name="Submitted By", value=f"{interaction.user.mention}", inline=False)
+        appeal_details_embed.add_field(name="Appeal Type", value=self.appeal_type.value, inline=False)
+        appeal_details_embed.add_field(name="Reason for Appeal", value=self.reason.value, inline=False)
+        appeal_details_embed.add_field(name="Additional Information", value=self.additional_info.value, inline=False)
+        appeal_details_embed.add_field(name="Appeal Channel", value=appeal_channel.mention, inline=False)
+
+        # Notify the bot owner and the user who submitted the appeal
+        bot_owner = await self.bot.resolve_user(OWNER_ID)
+        await appeal_channel.send(f"{bot_owner.mention}, {interaction.user.mention}, here is the appeal:", embed=appeal_details_embed, view=CloseAppealView(self.bot))
+
+        # Save the appeal channel ID
+        self.bot.storage.save_appeal(appeal_channel.id, interaction.user.id)
+
+        await interaction.response.send_message("Your appeal has been submitted!", ephemeral=True)
+
+class CloseAppealForm(discord.ui.Modal, title="Close Appeal"):
+    reason = discord.ui.TextInput(label="Reason for closing", style=discord.TextStyle.paragraph)
+
+    def __init__(self, bot, user_id):
+        super().__init__()
+        self.bot = bot
+        self.user_id = user_id
+
+    async def on_submit(self, interaction: discord.Interaction):
+        reason = self.reason.value
+        user = await self.bot.resolve_user(int(self.user_id))
+        try:
+            await user.send(f"Your appeal has been closed. Reason: {reason}")
+        except discord.errors.Forbidden:
+            await interaction.response.send_message(f"Unable to DM {user.mention}. Appeal closed. Reason: {reason} || Deleting in 5 seconds")
+            await asyncio.sleep(5)
+        await interaction.channel.delete()
+        self.bot.storage.remove_appeal(interaction.channel_id)
+
+# Persistent views: no timeout and a custom_id on every button, registered
+# once with bot.add_view so clicks on old messages are routed here.
+class AppealPanelView(discord.ui.View):
+    def __init__(self, bot):
+        super().__init__(timeout=None)
+        self.bot = bot
+
+    @discord.ui.button(label="Open Appeal", style=discord.ButtonStyle.primary, emoji="📝", custom_id=OPEN_APPEAL_ID)
+    async def open_appeal(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(AppealForm(self.bot))
+
+class CloseAppealView(discord.ui.View):
+    def __init__(self, bot):
+        super().__init__(timeout=None)
+        self.bot = bot
+
+    @discord.ui.button(label="Close Appeal", style=discord.ButtonStyle.danger, emoji="🔒", custom_id=CLOSE_APPEAL_ID)
+    async def close_appeal(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != OWNER_ID:
+            await interaction.response.send_message("Only the bot owner can close appeals.", ephemeral=True)
+            return
+
+        # Check if the channel is an appeal channel
+        appeal_data = self.bot.storage.load_appeals()
+        if str(interaction.channel_id) not in appeal_data:
+            await interaction.response.send_message("This is not an appeal channel.", ephemeral=True)
+            return
+
+        await interaction.response.send_modal(CloseAppealForm(self.bot, appeal_data[str(interaction.channel_id)]))
+
+def has_open_appeal_button(message):
+    for row in message.components:
+        for component in getattr(row, "children", []):
+            if getattr(component, "custom_id", None) == OPEN_APPEAL_ID:
+                return True
+    return False
+
+class Appeals(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self._panel_checked = False
+
+    async def cog_load(self):
+        # Re-adding a view with the same custom_ids replaces the old handlers after a reload
+        self.bot.add_view(AppealPanelView(self.bot))
+        self.bot.add_view(CloseAppealView(self.bot))
+
+    def _load_panel_id(self):
+        try:
+            with open(APPEAL_PANEL_STATE_FILE, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if state.get("channel_id") != APPEAL_PANEL_CHANNEL_ID:
+            return None
+        return state.get("message_id")
+
+    def _save_panel_id(self, message_id):
+        with open(APPEAL_PANEL_STATE_FILE, 'w') as f:
+            json.dump({"channel_id": APPEAL_PANEL_CHANNEL_ID, "message_id": message_id}, f)
+
+    async def _find_panel(self, channel):
+        # One fetch when the message ID is remembered, a short history scan otherwise
+        message_id = self._load_panel_id()
+        if message_id is not None:
+            try:
+                return await channel.fetch_message(message_id)
+            except discord.NotFound:
+                pass
+        async for message in channel.history(limit=PANEL_SEARCH_LIMIT):
+            if message.author.id == self.bot.user.id and has_open_appeal_button(message):
+                return message
+        return None
+
+    async def ensure_panel(self):
+        channel = await self.bot.resolve_channel(APPEAL_PANEL_CHANNEL_ID)
+        if channel is None:
+            print("Appeal panel channel not found.")
+            return None
+
+        message = await self._find_panel(channel)
+        if message is None:
+            message = await channel.send(embed=appeal_panel_embed(), view=AppealPanelView(self.bot))
+        self._save_panel_id(message.id)
+        return message
+
+    # on_ready fires again after reconnects, the panel only needs checking once
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if self._panel_checked:
+            return
+        self._panel_checked = True
+        try:
+            await self.ensure_panel()
+        except discord.HTTPException as e:
+            self._panel_checked = False
+            print(f"Failed to set up the appeal panel: {e}")
+
+async def setup(bot):
+    await bot.add_cog(Appeals(bot))
@@ -0,0 +1,53 @@
+import discord
+from discord.ext import commands
+import json
+import time
+
+# Load help data from JSON
+with open("help.json", "r") as f:
+    help_data = json.load(f)
+
+class General(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Custom Help Command
+    @commands.hybrid_command(description="Get help with using the bot!")
+    async def help(self, ctx):
+        embed = discord.Embed(
+            title=help_data["title"],
+            description=help_data["description"],
+            color=discord.Color.blue()
+        )
+        embed.add_field(name=help_data["field1-name"], value=help_data["field1"], inline=False)
+
+        button = discord.ui.Button(
+            label=help_data["button-text"], 
+            url=help_data["button-link"], 
+            emoji=help_data["button-emoji"]
+        )
+        view = discord.ui.View()
+        view.add_item(button)
+
+        await ctx.send(embed=embed, view=view)
+
+    @commands.hybrid_command(description="Check my ping!")
+    async def ping(self, ctx):
+        start_time = time.time()  # Record start time for measuring latency
+        message = await ctx.send("Pinging...")  # Send a message to track the latency
+
+        # Calculate latency in milliseconds
+        bot_latency = round(self.bot.latency * 1000, 1)  # WebSocket latency
+        message_latency = round((time.time() - start_time) * 1000, 1)  # Time it took to send the message
+
+        # Create an Embed
+        embed = discord.Embed(title="🏓 Pong!", color=discord.Color.blue())
+        embed.add_field(name="Bot Latency (WebSocket)", value=f"{bot_latency}ms", inline=False)
+        embed.add_field(name="Message Latency", value=f"{message_latency}ms", inline=False)
+        embed.set_footer(text=f"Requested by {ctx.author}", icon_url=ctx.author.avatar.url)
+
+        # Edit the original message to include the latency results in an embed
+        await message.edit(content=None, embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(General(bot))
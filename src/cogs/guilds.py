@@ -0,0 +1,73 @@
+import discord
+from discord.ext import commands
+
+class Guilds(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @commands.hybrid_command(description="Setup the bot for your server. (Administrator permissions or the Admin role set up here required!)")
+    @commands.guild_only()
+    async def setup(self, ctx, system: str = None, *, value: str = None):
+        guild_id = ctx.guild.id
+        settings = self.bot.guild_settings.get(guild_id)
+        
+        # Check if the user has administrator permissions or the guild's admin role
+        if not self.bot.permissions.is_admin(ctx.author):
+            await ctx.reply("You do not have permission to set this up.")
+            return
+
+        if system is None or value is None:
+            await ctx.reply("You must provide both a system (e.g., 'welcomer', 'adminrole', 'suggestions') and a value.")
+            return
+
+        if system == "welcomer":
+            try:
+                channel = await commands.TextChannelConverter().convert(ctx, value)
+                settings["welcome_channel"] = channel.id
+                embed = discord.Embed(title="Important Notice ⛔", description="The welcomer feature is currently broken! It'll be fixed in the future, Sorry for the inconvenience!", color=discord.Color.red())
+                await ctx.reply(f"Welcome channel has been set to {channel.mention}", embed=embed)
+            except commands.BadArgument:
+                await ctx.reply("Invalid channel. Please mention a valid text channel.")
+
+        elif system == "adminrole":
+            try:
+                role = await commands.RoleConverter().convert(ctx, value)
+                settings["admin_role"] = role.id
+                await ctx.reply(f"Admin role has been set to {role.name}")
+            except commands.BadArgument:
+                await ctx.reply("Invalid role. Please mention a valid role.")
+
+        elif system == "suggestions":
+            try:
+                channel = await commands.TextChannelConverter().convert(ctx, value)
+                settings["suggestion_channel"] = channel.id
+                await ctx.reply(f"Suggestion channel has been set to {channel.mention}")
+            except commands.BadArgument:
+                await ctx.reply("Invalid channel. Please mention a valid text channel.")
+
+        else:
+            await ctx.reply("Invalid system. Use 'welcomer', 'adminrole', or 'suggestions'.")
+
+        self.bot.guild_settings.set(guild_id, settings)
+
+    # Command to view current guild settings (Admin only)
+    @commands.hybrid_command(description="Get the guild's settings! (Administrator permission required)")
+    @commands.guild_only()
+    async def viewsettings(self, ctx):
+        if not self.bot.permissions.is_administrator(ctx.author):
+            raise commands.MissingPermissions(["administrator"])
+        guild_id = ctx.guild.id
+        settings = self.bot.guild_settings.get(guild_id)
+        welcome_channel = settings.get("welcome_channel", "Not set")
+        admin_role = settings.get("admin_role", "Not set")
+
+        welcome_channel = f"<#{welcome_channel}>" if welcome_channel != "Not set" else "Not set"
+        admin_role = f"<@&{admin_role}>" if admin_role != "Not set" else "Not set"
+
+        embed = discord.Embed(title=f"Settings for {ctx.guild.name}", color=discord.Color.blue())
+        embed.add_field(name="Welcome Channel", value=welcome_channel, inline=False)
+        embed.add_field(name="Admin Role", value=admin_role, inline=False)
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(Guilds(bot))
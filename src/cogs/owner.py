@@ -0,0 +1,470 @@
+import discord
+from discord.ext import commands
+import json
+import io
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from settings_cache import default_guild_settings, validate_guild_settings
+from metrics import registry as metrics
+from profiling import sample_stacks, format_folded
+from guild_export import export_guilds, import_guilds, parse_fields
+from storage import guild_shard
+import threading
+import os
+import tempfile
+
+# Longest run of !profile, in seconds
+PROFILE_MAX_SECONDS = 60
+
+# Rows per section in !stats
+STATS_ROWS = 8
+
+def format_ms(seconds):
+    if seconds is None:
+        return "-"
+    if seconds == float("inf"):
+        return ">10s"
+    return f"≤{seconds * 1000:g}ms"
+
+# Bulk guild reload tuning
+RELOAD_WORKERS = 8
+RELOAD_PROGRESS_INTERVAL = 2  # seconds between progress edits
+RELOAD_REPORT_LIMIT = 20  # guilds listed per problem in the report
+
+# Filters for export, e.g. !export min_id: 100 fields: admin_role,suggestion_channel.
+# The IDs are text, guild IDs are bigger than slash commands' integer options allow.
+class ExportFlags(commands.FlagConverter, delimiter=":"):
+    min_id: str = None
+    max_id: str = None
+    fields: str = None
+
+class Owner(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.bot.cluster.register("server_list", self.local_server_list)
+        self.bot.cluster.register("server_invites", self.local_server_invites)
+        self.bot.cluster.register("refresh_guild_settings", self.local_refresh_guild_settings)
+
+    @commands.hybrid_command(description="Owner only command!")
+    @commands.is_owner()  # Ensure only the bot owner can use this command
+    async def servers(self, ctx):
+        await ctx.defer()  # Slash commands must be answered within 3 seconds
+        # Every cluster worker lists the guilds on its own shards, invites are only made for the page shown
+        servers = [server for entries in await self.bot.cluster.gather("server_list") for server in entries]
+        if not servers:
+            await ctx.send("I'm not in any servers.")
+            return
+        servers.sort(key=lambda server: server[1].lower())
+
+        view = ServersView(self.bot, ctx.author.id, servers)
+        embed = await view.render()
+        view.message = await ctx.send(embed=embed, view=view)
+
+    async def local_server_list(self):
+        return [[str(guild.id), guild.name] for guild in self.bot.guilds]
+
+    async def local_server_invites(self, guild_ids):
+        # Invites for the guilds on this worker's shards, the others answer for theirs
+        guilds = [guild for guild in map(self.bot.get_guild, map(int, guild_ids)) if guild is not None]
+        urls = await self.bot.invites.get_many(guilds)
+        return {str(guild_id): url for guild_id, url in urls.items()}
+
+    async def local_refresh_guild_settings(self, guild_ids):
+        # Re-read the stored settings of the guilds on this worker's shards, guilds edited meanwhile keep their edits
+        owned = [guild_id for guild_id in guild_ids if self.bot.owns_guild(guild_id)]
+        def load():
+            return {guild_id: settings for guild_id in owned if (settings := self.bot.storage.load_guild(guild_id)) is not None}
+        self.bot.guild_settings.load_many(await asyncio.to_thread(load))
+
+    @commands.hybrid_command(description="Check the github repository for updates! (Owner Only)")
+    @commands.is_owner()  # Ensure only the bot owner can use this command
+    async def checkupdate(self, ctx):
+        await ctx.defer()
+        pipeline = self.bot.update_pipeline
+        response = await self.bot.github.get_commits(self.bot.github_repo, branch=self.bot.update_branch)
+
+        if response.ok:
+            commits = response.data
+            if commits:
+                latest_commit = commits[0]['sha']
+                if pipeline.current_sha is None:
+                    pipeline.seed(latest_commit)  # Initialize on first run
+                    await ctx.send("Initialized with the latest commit.")
+                elif latest_commit != pipeline.current_sha:
+                    await ctx.send("New commit detected! Applying the update...")
+                    applied = await pipeline.trigger(latest_commit, "checkupdate")
+                    report = self.bot.extension_reloader.last_report
+                    if report is not None:
+                        await ctx.send(report.summary())
+                    if not applied and pipeline.current_sha != latest_commit:
+                        await ctx.send(f"The checkout doesn't have {latest_commit[:7]} yet, pull it and check again.")
+                else:
+                    await ctx.send("No new commits detected.")
+        else:
+            await ctx.send(f"Failed to fetch commits: {response.status} - {response.text}")
+
+    @commands.hybrid_command(description="Add the configuration to a guild (Owner only)")
+    @commands.is_owner()
+    async def create(self, ctx, guild_id: str):
+        # Guild IDs are taken as text, they are bigger than slash commands' integer options allow
+        if not guild_id.isdigit():
+            await ctx.send("Invalid guild ID.")
+            return
+        self.bot.guild_settings.set(guild_id, default_guild_settings())
+        await ctx.send(f"Config for guild {guild_id} has been created with default settings.")
+
+    # Command to add a VIP member (Bot owner only)
+    @commands.hybrid_command(description="Add a VIP member to the Database. (Owner only)")
+    @commands.is_owner()
+    async def addvip(self, ctx, user: discord.User = None):
+        if user is None:
+            await ctx.send("Please provide a user to add as VIP.")
+            return
+
+        if self.bot.storage.add_vip(user.id):
+            self.bot.vips.publish_add(user.id)
+            await ctx.send(f"Added {user.name} (ID: {user.id}) to the VIP list.")
+        else:
+            await ctx.send(f"{user.name} (ID: {user.id}) is already a VIP member.")
+
+    # Command to remove a VIP member (Bot owner only)
+    @commands.hybrid_command(description="Remove a VIP member from the Database. (Owner only)")
+    @commands.is_owner()
+    async def removevip(self, ctx, user: discord.User = None):
+        if user is None:
+            await ctx.send("Please provide a user to remove from VIP.")
+            return
+
+        if self.bot.storage.remove_vip(user.id):
+            self.bot.vips.publish_remove(user.id)
+            await ctx.send(f"Removed {user.name} (ID: {user.id}) from the VIP list.")
+        else:
+            await ctx.send(f"{user.name} (ID: {user.id}) is not a VIP member.")
+
+    # Command to add a staff member (Bot owner only)
+    @commands.hybrid_command(description="Add a staff member to the Database. (Owner only)")
+    @commands.is_owner()
+    async def addstaff(self, ctx, user: discord.User = None):
+        if user is None:
+            await ctx.send("Please provide a user to add as staff.")
+            return
+
+        if self.bot.storage.add_staff(user.id):
+            self.bot.staff.publish_add(user.id)
+            await ctx.send(f"Added {user.name} (ID: {user.id}) to the staff list.")
+        else:
+            await ctx.send(f"{user.name} (ID: {user.id}) is already a staff member.")
+
+    # Command to remove a staff member (Bot owner only)
+    @commands.hybrid_command(description="Remove a staff member from the Database. (Owner only)")
+    @commands.is_owner()
+    async def removestaff(self, ctx, user: discord.User = None):
+        if user is None:
+            await ctx.send("Please provide a user to remove from staff.")
+            return
+
+        if self.bot.storage.remove_staff(user.id):
+            self.bot.staff.publish_remove(user.id)
+            await ctx.send(f"Removed {user.name} (ID: {user.id}) from the staff list.")
+        else:
+            await ctx.send(f"{user.name} (ID: {user.id}) is not a staff member.")
+
+    @commands.hybrid_command(description="Force reload staff data, guild settings or changed command modules. (Owner only)")
+    @commands.is_owner()
+    async def reload(self, ctx, option: str):
+        await ctx.defer()
+        if option.lower() == "staff":
+            self.bot.staff.refresh(force=True)
+            await ctx.send(f"Staff list has been force-updated. Current staff: {len(self.bot.staff)} members.")
+        elif option.lower() == "guilds":
+            await self.reload_guilds(ctx)
+        elif option.lower() == "vips":
+            self.bot.vips.refresh(force=True)
+            await ctx.send(f"VIP list has been force-updated. Current VIP count: {len(self.bot.vips)} members.")
+        elif option.lower() == "commands":
+            report = await self.bot.extension_reloader.reload_changed()
+            summary = report.summary()
+            if report.changed and self.bot.cluster_config.is_primary:
+                self.bot.docs_publisher.schedule(self.bot.commands, self.bot.display_prefix)
+                summary += "\n" + await self.bot.sync_command_tree()
+            await ctx.send(summary)
+        else:
+            prefix = self.bot.display_prefix
+            await ctx.send(f"Invalid option. Use '{prefix}reload staff', '{prefix}reload guilds', '{prefix}reload vips' or '{prefix}reload commands'.")
+
+    @commands.hybrid_command(description="Sync the slash commands with Discord if they changed, force to sync anyway. (Owner only)")
+    @commands.is_owner()
+    async def sync(self, ctx, mode: str = None):
+        await ctx.defer()
+        await ctx.send(await self.bot.sync_command_tree(force=mode == "force"))
+
+    async def reload_guilds(self, ctx):
+        # Only this worker's guilds, the others cache their own. Files not named by a guild ID
+        # belong to no shard, they are reported as malformed without being read.
+        stored = await asyncio.to_thread(self.bot.storage.list_guilds)
+        misnamed = [guild_id for guild_id in stored if not guild_id.isdigit()]
+        guild_ids = [guild_id for guild_id in stored if guild_id.isdigit() and self.bot.owns_guild(guild_id)]
+        total_guilds = len(guild_ids) + len(misnamed)
+        if total_guilds == 0:
+            await ctx.send("No guild settings found to reload.")
+            return
+
+        message = await ctx.send(f"Reloading guild settings... 0/{total_guilds}")
+
+        # Write pending changes first so reloading doesn't lose them
+        await self.bot.guild_settings.flush_async()
+
+        def load(guild_id):
+            try:
+                return guild_id, self.bot.storage.load_guild(guild_id), None
+            except Exception as e:
+                return guild_id, None, str(e)
+
+        # Parse in a thread pool, the progress message is edited at most every RELOAD_PROGRESS_INTERVAL seconds
+        loop = asyncio.get_running_loop()
+        loaded, orphaned = {}, []
+        malformed = {guild_id: ["file name is not a guild ID"] for guild_id in misnamed}
+        last_edit = time.monotonic()
+        with ThreadPoolExecutor(max_workers=RELOAD_WORKERS) as pool:
+            futures = [loop.run_in_executor(pool, load, guild_id) for guild_id in guild_ids]
+            for done, future in enumerate(asyncio.as_completed(futures), start=len(misnamed) + 1):
+                guild_id, settings, error = await future
+                if error:
+                    problems = [error]
+                elif settings is None:
+                    problems = []  # the file went away while we were reloading
+                else:
+                    problems = validate_guild_settings(settings)
+                if problems:
+                    malformed[guild_id] = problems
+                elif settings is not None:
+                    loaded[guild_id] = settings
+                    if self.bot.get_guild(int(guild_id)) is None:
+                        orphaned.append(guild_id)
+                if time.monotonic() - last_edit >= RELOAD_PROGRESS_INTERVAL:
+                    last_edit = time.monotonic()
+                    await message.edit(content=f"Reloading guild settings... {done}/{total_guilds}")
+
+        # Swap everything into the live cache at once
+        self.bot.guild_settings.load_many(loaded)
+
+        report = [f"Reloaded {len(loaded)}/{total_guilds} guild settings."]
+        if malformed:
+            report.append(f"Malformed ({len(malformed)}):")
+            report.extend(f"- {guild_id}: {'; '.join(problems)}" for guild_id, problems in sorted(malformed.items())[:RELOAD_REPORT_LIMIT])
+        if orphaned:
+            report.append(f"Orphaned, I'm no longer in these guilds ({len(orphaned)}): {', '.join(sorted(orphaned)[:RELOAD_REPORT_LIMIT])}")
+        await message.edit(content="\n".join(report)[:2000])
+
+    @commands.hybrid_command(description="Show command, storage, HTTP and event-loop timings. (Owner only)")
+    @commands.is_owner()
+    async def stats(self, ctx):
+        embed = discord.Embed(title="📊 Stats", color=discord.Color.blue())
+        snapshot = metrics.snapshot()
+        histograms = snapshot["histograms"]
+        errors = snapshot["counters"].get("command_errors_total", {})
+
+        def describe(histograms, label, limit=STATS_ROWS):
+            # The busiest series first, each with its count and p50/p99 in milliseconds
+            rows = sorted(histograms.items(), key=lambda item: -item[1].count)[:limit]
+            lines = []
+            for key, histogram in rows:
+                labels = dict(key)
+                lines.append(f"`{label(labels)}` {histogram.count}× p50 {format_ms(histogram.quantile(0.5))} p99 {format_ms(histogram.quantile(0.99))}")
+            return "\n".join(lines) or "No data yet."
+
+        def command_label(labels):
+            failed = sum(count for key, count in errors.items() if dict(key).get("command") == labels["command"])
+            return f"{labels['command']}" + (f" ({failed} errors)" if failed else "")
+
+        embed.add_field(name="Commands", value=describe(histograms.get("command_seconds", {}), command_label), inline=False)
+        embed.add_field(name="Background loops", value=describe(histograms.get("loop_seconds", {}), lambda labels: labels["loop"]), inline=False)
+        embed.add_field(name="Storage", value=describe(histograms.get("storage_seconds", {}), lambda labels: labels["op"]), inline=False)
+        embed.add_field(name="HTTP", value=describe(histograms.get("http_request_seconds", {}), lambda labels: f"{labels['service']} {labels['method']} {labels.get('route', '')} {labels['status']}".replace("  ", " ")), inline=False)
+
+        lag = histograms.get("event_loop_lag_seconds", {}).get(())
+        if lag is not None:
+            embed.add_field(name="Event loop lag", value=f"p50 {format_ms(lag.quantile(0.5))} p99 {format_ms(lag.quantile(0.99))} max bucket {format_ms(lag.quantile(1.0))}", inline=False)
+        embed.add_field(name="WebSocket latency", value=f"{round(self.bot.latency * 1000, 1)}ms", inline=False)
+        if self.bot.cluster_config.multi_process:
+            embed.set_footer(text=f"Cluster {self.bot.cluster_config.cluster_id} only")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(description="Show the health, last run and next run of every background job. (Owner only)")
+    @commands.is_owner()
+    async def jobs(self, ctx):
+        embed = discord.Embed(title="⏱️ Background jobs", color=discord.Color.blue())
+        now = time.time()
+        for job in self.bot.scheduler.jobs.values():
+            lines = [f"**{job.health}**, every {job.interval:g}s, {job.runs} runs, {job.errors} errors, {job.skipped} skipped"]
+            if job.last_started is not None:
+                duration = "still running" if job.running else f"took {job.last_duration * 1000:.1f}ms"
+                lines.append(f"Last run {now - job.last_started:.0f}s ago, {duration}")
+            if job.next_run is not None and not job.running:
+                lines.append(f"Next run in {max(job.next_run - now, 0):.0f}s")
+            if job.failures:
+                lines.append(f"{job.failures} failures in a row, last: {job.last_error[:200]}")
+            embed.add_field(name=job.name, value="\n".join(lines), inline=False)
+        if self.bot.cluster_config.multi_process:
+            embed.set_footer(text=f"Cluster {self.bot.cluster_config.cluster_id} only")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(description="Sample the event loop for a few seconds and get a flamegraph file. (Owner only)")
+    @commands.is_owner()
+    async def profile(self, ctx, seconds: float = 10.0):
+        seconds = min(max(seconds, 1), PROFILE_MAX_SECONDS)
+        await ctx.send(f"Profiling the event loop for {seconds:g}s...")
+
+        # The sampler runs on a worker thread and looks at this (the loop's) thread
+        samples = await asyncio.to_thread(sample_stacks, threading.get_ident(), seconds)
+        if not samples:
+            await ctx.send("No samples were taken.")
+            return
+        data = format_folded(samples).encode()
+        file = discord.File(io.BytesIO(data), "profile.folded")
+        await ctx.send(f"{sum(samples.values())} samples, {len(samples)} distinct stacks. Open it with speedscope or flamegraph.pl.", file=file)
+
+    # Owner-only command to retrieve the JSON settings for a guild
+    @commands.hybrid_command(description="Get a guild's Data (Owner only)")
+    @commands.is_owner()
+    async def data(self, ctx, guild_id: str):
+        if not guild_id.isdigit():
+            await ctx.send("Invalid guild ID.", ephemeral=True)
+            return
+        await self.bot.guild_settings.flush_async()  # Make sure the stored copy is current
+        if self.bot.storage.load_guild(guild_id) is not None:
+            view = GetDataView(self.bot.storage, guild_id)
+            await ctx.send("Click the button to receive the JSON file:", view=view, ephemeral=True)
+        else:
+            await ctx.send(f"No settings file found for guild ID {guild_id}", ephemeral=True)
+
+    # Owner-only command to export every guild's settings as one gzipped NDJSON file
+    @commands.hybrid_command(description="Export guild settings as a .ndjson.gz file, optionally by min_id:/max_id:/fields: (Owner only)")
+    @commands.is_owner()
+    async def export(self, ctx, *, flags: ExportFlags):
+        if not all(value is None or value.isdigit() for value in (flags.min_id, flags.max_id)):
+            await ctx.send("min_id and max_id must be guild IDs.")
+            return
+        min_id, max_id = (int(value) if value else None for value in (flags.min_id, flags.max_id))
+        await ctx.defer()
+        await self.bot.guild_settings.flush_async()  # Make sure the stored copies are current
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "guilds.ndjson.gz")
+            # Guilds are streamed from storage to the file on a worker thread
+            count = await asyncio.to_thread(export_guilds, self.bot.storage, path, min_id, max_id, parse_fields(flags.fields))
+            size = os.path.getsize(path)
+            if ctx.guild is not None and size > ctx.guild.filesize_limit:
+                await ctx.send(f"The export of {count} guilds is {size / 2 ** 20:.1f}MB, too big to upload here. Use `python src/guild_export.py export` on the host instead.")
+                return
+            await ctx.send(f"Exported {count} guilds.", file=discord.File(path))
+
+    # Owner-only command to import an export attached to the message
+    @commands.hybrid_command(name="import", description="Import guild settings from a .ndjson(.gz) export, dryrun only validates it (Owner only)")
+    @commands.is_owner()
+    async def import_(self, ctx, attachment: discord.Attachment, mode: str = None):
+        dry_run = mode == "dryrun"
+        message = await ctx.send(f"{'Validating' if dry_run else 'Importing'} {attachment.filename}...")
+
+        loop = asyncio.get_running_loop()
+
+        # Every cluster worker refreshes its live cache batch by batch, the import waits for them
+        # before reading on. Guilds edited since the import started keep their edits.
+        def on_batch(batch):
+            asyncio.run_coroutine_threadsafe(self.bot.cluster.gather("refresh_guild_settings", list(batch)), loop).result()
+
+        # Called from the import thread, the message is edited at most every RELOAD_PROGRESS_INTERVAL seconds
+        last_edit = time.monotonic()
+
+        def progress(lines):
+            nonlocal last_edit
+            if time.monotonic() - last_edit >= RELOAD_PROGRESS_INTERVAL:
+                last_edit = time.monotonic()
+                asyncio.run_coroutine_threadsafe(message.edit(content=f"Importing {attachment.filename}... {lines} lines"), loop)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "guilds.ndjson.gz" if attachment.filename.endswith(".gz") else "guilds.ndjson")
+            await attachment.save(path)
+            await self.bot.guild_settings.flush_async()
+            report = await asyncio.to_thread(import_guilds, self.bot.storage, path, dry_run=dry_run, on_batch=on_batch, progress=progress)
+        await message.edit(content=report.summary()[:2000])
+
+# Pages through the server list, one embed of SERVERS_PER_PAGE guilds at a time
+SERVERS_PER_PAGE = 10
+
+class ServersView(discord.ui.View):
+    def __init__(self, bot, owner_id, servers):
+        super().__init__(timeout=300)
+        self.bot = bot
+        self.owner_id = owner_id
+        self.servers = servers  # [[guild_id, name], ...]
+        self.page = 0
+        self.pages = (len(servers) + SERVERS_PER_PAGE - 1) // SERVERS_PER_PAGE
+        self.message = None
+
+    async def render(self):
+        start = self.page * SERVERS_PER_PAGE
+        page = self.servers[start:start + SERVERS_PER_PAGE]
+        invites = {}
+        for urls in await self.bot.cluster.gather("server_invites", [guild_id for guild_id, _ in page]):
+            invites.update(urls)
+
+        embed = discord.Embed(title="Servers I'm In", color=discord.Color.blue())
+        for guild_id, name in page:
+            url = invites.get(guild_id)
+            embed.add_field(name=f"{name} (ID: {guild_id})",
+                            value=f"[Join]({url})" if url else "No permission to create invite",
+                            inline=False)
+        embed.set_footer(text=f"Page {self.page + 1}/{self.pages} · {len(self.servers)} servers")
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= self.pages - 1
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("You are not authorized to use these buttons.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction, page):
+        self.page = page
+        # Invites may take a moment, acknowledge the click first
+        await interaction.response.defer()
+        embed = await self.render()
+        await interaction.edit_original_response(embed=embed, view=self)
+
+    @discord.ui.button(label="Previous", style=discord.ButtonStyle.secondary, emoji="◀️")
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, max(self.page - 1, 0))
+
+    @discord.ui.button(label="Next", style=discord.ButtonStyle.secondary, emoji="▶️")
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, min(self.page + 1, self.pages - 1))
+
+    async def on_timeout(self):
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+class GetDataView(discord.ui.View):
+    def __init__(self, storage, guild_id):
+        super().__init__()
+        self.storage = storage
+        self.guild_id = guild_id
+
+    @discord.ui.button(label="Get File", style=discord.ButtonStyle.secondary, emoji="💫")
+    async def get_json(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != 898255050592366642:
+            await interaction.response.send_message("You are not authorized to use this button.", ephemeral=True)
+            return
+        
+        settings = self.storage.load_guild(self.guild_id)
+        file = discord.File(io.BytesIO(json.dumps(settings, indent=4).encode()), f"{self.guild_id}.json")
+        await interaction.response.send_message(f"Here is the website URL too! https://divine-development.github.io/divine/database/guilds/{guild_shard(self.guild_id)}/{self.guild_id}.json", file=file, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Owner(bot))
@@ -0,0 +1,139 @@
+import discord
+from discord.ext import commands
+
+from suggestions import UPVOTE, DOWNVOTE, VOTE_EMOJIS, STATUSES
+
+SUGGESTIONS_LIST_LIMIT = 10
+STATUS_COLORS = {
+    "approved": discord.Color.green(),
+    "denied": discord.Color.red(),
+    "implemented": discord.Color.gold(),
+}
+
+def format_suggestion(row):
+    content = row["content"] if len(row["content"]) <= 100 else row["content"][:97] + "..."
+    return f"**#{row['id']}** {UPVOTE} {row['upvotes']} {DOWNVOTE} {row['downvotes']} - {content}"
+
+class Suggestions(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    # Command to submit a suggestion
+    @commands.hybrid_command(description="Create a suggestion inside a server with me! (Must be setup via setup [suggestions] [channel])")
+    @commands.guild_only()
+    async def suggest(self, ctx, *, suggestion: str):
+        guild_id = ctx.guild.id
+        settings = self.bot.guild_settings.get(guild_id)
+        suggestion_channel_id = settings.get("suggestion_channel")
+
+        if suggestion_channel_id is None:
+            await ctx.send("Suggestion channel is not set. Please ask an admin to set it using the `setup suggestions` command.")
+            return
+
+        suggestion_channel = await self.bot.resolve_channel(suggestion_channel_id)
+        if suggestion_channel is None:
+            await ctx.send("Suggestion channel not found. Please ask an admin to reconfigure it.")
+            return
+
+        suggestion_id = self.bot.suggestions.create(guild_id, suggestion_channel.id, ctx.author.id, suggestion)
+
+        # The row is removed again if the suggestion never makes it into the channel
+        try:
+            embed = discord.Embed(
+                title=f"New Suggestion #{suggestion_id}",
+                description=suggestion,
+                color=discord.Color.blue()
+            )
+            embed.set_author(name=ctx.author.name, icon_url=ctx.author.display_avatar.url)
+            embed.set_footer(text=f"Suggested by {ctx.author.name}", icon_url=ctx.author.display_avatar.url)
+
+            suggestion_message = await suggestion_channel.send(embed=embed)
+            # Votes are matched to the suggestion by message ID
+            self.bot.suggestions.attach_message(suggestion_id, suggestion_message.id)
+        except Exception:
+            self.bot.suggestions.delete(suggestion_id)
+            raise
+
+        await suggestion_message.add_reaction(UPVOTE)
+        await suggestion_message.add_reaction(DOWNVOTE)
+
+        await ctx.send(f"Your suggestion #{suggestion_id} has been sent to {suggestion_channel.mention}")
+
+    # Raw events arrive whether or not the message or member is cached, so
+    # the tallies stay right without fetching anything
+    def _record_vote(self, payload, added):
+        if payload.guild_id is None or payload.user_id == self.bot.user.id:
+            return
+        emoji = str(payload.emoji)
+        if emoji in VOTE_EMOJIS:
+            self.bot.suggestions.record_vote(payload.message_id, payload.user_id, emoji, added)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        self._record_vote(payload, True)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        self._record_vote(payload, False)
+
+    # Command to list the highest voted open suggestions
+    @commands.hybrid_command(description="See the top voted open suggestions of this server!")
+    @commands.guild_only()
+    async def topsuggestions(self, ctx):
+        rows = self.bot.suggestions.top(ctx.guild.id, SUGGESTIONS_LIST_LIMIT)
+        if not rows:
+            await ctx.send("There are no open suggestions yet.")
+            return
+        embed = discord.Embed(title=f"Top suggestions in {ctx.guild.name}", description="\n".join(map(format_suggestion, rows)), color=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+    # Command to list the newest open suggestions
+    @commands.hybrid_command(description="See the newest open suggestions of this server!")
+    @commands.guild_only()
+    async def opensuggestions(self, ctx):
+        rows = self.bot.suggestions.open(ctx.guild.id, SUGGESTIONS_LIST_LIMIT)
+        if not rows:
+            await ctx.send("There are no open suggestions yet.")
+            return
+        embed = discord.Embed(title=f"Open suggestions in {ctx.guild.name}", description="\n".join(map(format_suggestion, rows)), color=discord.Color.blue())
+        await ctx.send(embed=embed)
+
+    # Command to close a suggestion (Administrator permissions or the admin role required)
+    @commands.hybrid_command(description="Mark a suggestion approved, denied, implemented or open. (Administrator permissions or Admin role)")
+    @commands.guild_only()
+    async def resolve(self, ctx, suggestion_id: int, status: str):
+        if not self.bot.permissions.is_admin(ctx.author):
+            await ctx.reply("You do not have permission to resolve suggestions.")
+            return
+
+        status = status.lower()
+        if status not in STATUSES:
+            await ctx.reply(f"Invalid status. Use {', '.join(f'`{s}`' for s in STATUSES)}.")
+            return
+
+        row = self.bot.suggestions.get(ctx.guild.id, suggestion_id)
+        if row is None:
+            await ctx.reply(f"Suggestion #{suggestion_id} not found.")
+            return
+
+        self.bot.suggestions.set_status(ctx.guild.id, suggestion_id, status)
+        await ctx.reply(f"Suggestion #{suggestion_id} is now **{status}** ({UPVOTE} {row['upvotes']} {DOWNVOTE} {row['downvotes']}).")
+
+        # Reflect the outcome on the suggestion itself
+        channel = await self.bot.resolve_channel(row["channel_id"])
+        if channel is None or row["message_id"] is None:
+            return
+        message = channel.get_partial_message(row["message_id"])
+        embed = discord.Embed(
+            title=f"Suggestion #{suggestion_id} ({status})",
+            description=row["content"],
+            color=STATUS_COLORS.get(status, discord.Color.blue())
+        )
+        embed.set_footer(text=f"{UPVOTE} {row['upvotes']} {DOWNVOTE} {row['downvotes']}")
+        try:
+            await message.edit(embed=embed)
+        except discord.HTTPException:
+            pass
+
+async def setup(bot):
+    await bot.add_cog(Suggestions(bot))
@@ -0,0 +1,44 @@
+import hashlib
+import json
+
+COMMAND_TREE_STATE_FILE = "database/command_tree_state.json"
+
+# Function to hash the application command payloads Discord would receive, in a stable order
+def tree_hash(tree):
+    payloads = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda payload: (payload.get("type", 1), payload["name"]))
+    return hashlib.sha256(json.dumps(payloads, sort_keys=True).encode()).hexdigest()
+
+# Syncs the global application command tree only when its definitions changed.
+#
+# Syncing is rate limited and slow to propagate, so the hash of the last
+# synced tree is kept in a small state file and a restart or a reload that
+# didn't touch any command signature sends nothing.
+class CommandTreeSync:
+    def __init__(self, tree, state_file=COMMAND_TREE_STATE_FILE):
+        self.tree = tree
+        self.state_file = state_file
+        self._state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, digest, count):
+        self._state = {"hash": digest, "commands": count}
+        with open(self.state_file, 'w') as f:
+            json.dump(self._state, f)
+
+    @property
+    def synced_hash(self):
+        return self._state.get("hash")
+
+    async def sync(self, force=False):
+        digest = tree_hash(self.tree)
+        if digest == self.synced_hash and not force:
+            return None
+        synced = await self.tree.sync()
+        self._save_state(digest, len(synced))
+        return synced
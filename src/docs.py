@@ -0,0 +1,218 @@
+import asyncio
+import base64
+import hashlib
+import html
+import json
+from string import Template
+
+DOCS_PATH = "commands/index.html"
+DOCS_STATE_FILE = "database/docs_state.json"
+
+# Page layout, compiled once and filled with the rendered commands in one pass
+DOCS_TEMPLATE = Template("""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Divine Commands</title>
+        <style>
+            body, html {
+                margin: 0;
+                padding: 0;
+                height: 100%;
+                font-family: Arial, sans-serif;
+                color: #fff;
+                background: #000 url('https://images.unsplash.com/photo-1519681393784-d120267933ba') no-repeat center center fixed;
+                background-size: cover;
+            }
+            .container {
+                max-width: 800px;
+                margin: 0 auto;
+                padding: 20px;
+                background-color: rgba(0, 0, 0, 0.7);
+                min-height: 100%;
+                box-sizing: border-box;
+            }
+            h1 {
+                text-align: center;
+                color: #fff;
+                font-size: 3em;
+                margin-bottom: 30px;
+                animation: glow 2s ease-in-out infinite alternate;
+            }
+            .command {
+                background-color: rgba(255, 255, 255, 0.1);
+                border-radius: 10px;
+                padding: 15px;
+                margin-bottom: 20px;
+                cursor: pointer;
+                transition: all 0.3s ease;
+            }
+            .command:hover {
+                transform: translateY(-5px);
+                box-shadow: 0 5px 15px rgba(255, 255, 255, 0.2);
+            }
+            .command h2 {
+                margin-top: 0;
+                color: #4da6ff;
+            }
+            .command-details {
+                display: none;
+                margin-top: 10px;
+                padding-top: 10px;
+                border-top: 1px solid rgba(255, 255, 255, 0.2);
+            }
+            @keyframes glow {
+                from {
+                    text-shadow: 0 0 5px #fff, 0 0 10px #fff, 0 0 15px #fff, 0 0 20px #4da6ff, 0 0 35px #4da6ff, 0 0 40px #4da6ff, 0 0 50px #4da6ff, 0 0 75px #4da6ff;
+                }
+                to {
+                    text-shadow: 0 0 10px #fff, 0 0 20px #fff, 0 0 30px #fff, 0 0 40px #4da6ff, 0 0 70px #4da6ff, 0 0 80px #4da6ff, 0 0 100px #4da6ff, 0 0 150px #4da6ff;
+                }
+            }
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>Divine Commands</h1>
+$commands
+        </div>
+        <script>
+            function toggleDetails(element) {
+                var details = element.querySelector('.command-details');
+                if (details.style.display === 'none' || details.style.display === '') {
+                    details.style.display = 'block';
+                } else {
+                    details.style.display = 'none';
+                }
+            }
+        </script>
+    </body>
+    </html>
+""")
+
+COMMAND_TEMPLATE = Template("""
+            <div class="command" onclick="toggleDetails(this)">
+                <h2>$name</h2>
+                <div class="command-details">
+                    <p><strong>Description:</strong> $description</p>
+                    <p><strong>Usage:</strong> $usage</p>
+                </div>
+            </div>
+""")
+
+# Marker put into the published page so a copy on GitHub can be matched to a registry hash
+HASH_MARKER = "<!-- commands-hash: {} -->"
+
+# Function to hash what the docs show for each command, in a stable order
+def registry_hash(commands, prefix):
+    entries = sorted((command.name, command.description or "", command.signature) for command in commands)
+    return hashlib.sha256(json.dumps([prefix, entries]).encode()).hexdigest()
+
+def render_docs(commands, prefix, digest):
+    rendered = "".join(
+        COMMAND_TEMPLATE.substitute(
+            name=html.escape(command.name),
+            description=html.escape(command.description or 'No description available.', quote=False),
+            usage=html.escape(f"{prefix}{command.name} {command.signature}", quote=False),
+        )
+        for command in sorted(commands, key=lambda command: command.name)
+    )
+    return DOCS_TEMPLATE.substitute(commands=rendered) + HASH_MARKER.format(digest) + "\n"
+
+# Publishes commands/index.html to GitHub when the command registry changed.
+#
+# The hash of the last published registry and the blob SHA GitHub gave back
+# are kept in a small state file. When the hash still matches nothing is sent
+# at all; otherwise the page is PUT with the remembered blob SHA, falling back
+# to a GET only when there is no SHA yet or GitHub reports it is stale.
+# Publishing runs as a background task and is retried with backoff.
+class DocsPublisher:
+    def __init__(self, github, repo, branch="main", path=DOCS_PATH, state_file=DOCS_STATE_FILE, max_attempts=5):
+        self.github = github
+        self.repo = repo
+        self.branch = branch
+        self.path = path
+        self.state_file = state_file
+        self.max_attempts = max_attempts
+        self._task = None
+        self._state = self._load_state()
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_state(self, digest, blob_sha):
+        self._state = {"hash": digest, "sha": blob_sha}
+        with open(self.state_file, 'w') as f:
+            json.dump(self._state, f)
+
+    @property
+    def published_hash(self):
+        return self._state.get("hash")
+
+    def schedule(self, commands, prefix):
+        # Snapshot the registry now, the task may run after another reload
+        commands = list(commands)
+        digest = registry_hash(commands, prefix)
+        if digest == self.published_hash:
+            return None
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.create_task(self._publish(commands, prefix, digest))
+        return self._task
+
+    async def _publish(self, commands, prefix, digest):
+        content = render_docs(commands, prefix, digest)
+        for attempt in range(self.max_attempts):
+            try:
+                if await self._put(content, digest):
+                    return True
+            except Exception as e:
+                print(f"An error occurred while updating the documentation: {str(e)}")
+            await asyncio.sleep(2 ** attempt)
+        print(f"Giving up on the documentation update after {self.max_attempts} attempts.")
+        return False
+
+    async def _put(self, content, digest):
+        blob_sha = self._state.get("sha")
+        if blob_sha is None:
+            blob_sha = await self._fetch_sha(digest)
+            if blob_sha is True:
+                return True  # GitHub already has this version
+
+        response = await self._send(content, blob_sha)
+        if response.status in (409, 422):
+            # Our blob SHA is stale, someone else changed the file
+            blob_sha = await self._fetch_sha(digest)
+            if blob_sha is True:
+                return True
+            response = await self._send(content, blob_sha)
+
+        if response.ok:
+            self._save_state(digest, response.data["content"]["sha"])
+            print("Documentation updated successfully on GitHub.")
+            return True
+        print(f"Failed to update documentation. Status code: {response.status}")
+        return False
+
+    async def _send(self, content, blob_sha):
+        encoded = base64.b64encode(content.encode()).decode()
+        return await self.github.put_contents(self.repo, self.path, encoded, "Update bot commands documentation", sha=blob_sha, branch=self.branch)
+
+    async def _fetch_sha(self, digest):
+        # Returns the current blob SHA, or True when the remote page already matches digest
+        response = await self.github.get_contents(self.repo, self.path, ref=self.branch)
+        if response.status == 404:
+            return None
+        if not response.ok:
+            raise RuntimeError(f"Failed to get current file contents. Status code: {response.status}")
+        current = base64.b64decode(response.data.get("content", "")).decode(errors="replace")
+        if HASH_MARKER.format(digest) in current:
+            self._save_state(digest, response.data["sha"])
+            return True
+        return response.data["sha"]
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import deque
+
+from metrics import registry as metrics
+
+# Discord allows 120 gateway commands per 60 seconds on each shard connection
+GATEWAY_COMMAND_LIMIT = 120
+GATEWAY_COMMAND_WINDOW = 60.0
+# Commands left alone for heartbeats, member requests and whatever discord.py sends itself
+GATEWAY_COMMAND_RESERVE = 20
+
+metrics.describe("gateway_commands_total", "Gateway commands the bot sent itself, by shard and kind")
+metrics.describe("gateway_budget_used", "Gateway commands the bot sent itself in the current window")
+metrics.describe("gateway_budget_remaining", "Commands discord.py's own limiter has left in its window")
+metrics.describe("presence_updates_total", "Presence updates, by whether they were sent, unchanged or held back")
+
+# Keeps count of the gateway commands the bot sends on each shard in a sliding
+# window, so optional traffic like presence updates can step aside before it
+# eats into what heartbeats and discord.py's own requests need.
+class GatewayBudget:
+    def __init__(self, bot, limit=GATEWAY_COMMAND_LIMIT, per=GATEWAY_COMMAND_WINDOW, reserve=GATEWAY_COMMAND_RESERVE):
+        self.bot = bot
+        self.limit = limit
+        self.per = per
+        self.reserve = reserve
+        self._sent = {}  # shard_id -> deque of send times
+
+    def _window(self, shard_id):
+        sent = self._sent.setdefault(shard_id, deque())
+        cutoff = time.monotonic() - self.per
+        while sent and sent[0] <= cutoff:
+            sent.popleft()
+        return sent
+
+    def used(self, shard_id):
+        return len(self._window(shard_id))
+
+    # discord.py keeps its own per-connection limiter, read it when the shard has one
+    def library_remaining(self, shard_id):
+        try:
+            limiter = self.bot.get_shard(shard_id)._parent.ws._rate_limiter
+        except AttributeError:
+            return None
+        if time.time() > limiter.window + limiter.per:
+            return limiter.max
+        return limiter.remaining
+
+    def available(self, shard_id):
+        own = self.limit - self.reserve - self.used(shard_id)
+        remaining = self.library_remaining(shard_id)
+        if remaining is not None:
+            own = min(own, remaining - self.reserve)
+        return max(own, 0)
+
+    def record(self, shard_id, kind):
+        self._window(shard_id).append(time.monotonic())
+        metrics.inc("gateway_commands_total", shard=shard_id, kind=kind)
+        self.publish(shard_id)
+
+    def publish(self, shard_id=None):
+        shard_ids = [shard_id] if shard_id is not None else list(self.bot.shards)
+        for shard in shard_ids:
+            metrics.set("gateway_budget_used", self.used(shard), shard=shard)
+            remaining = self.library_remaining(shard)
+            if remaining is not None:
+                metrics.set("gateway_budget_remaining", remaining, shard=shard)
+
+# Sends presence updates only when the rendered status differs from what the
+# shard last got, and at most once per min_interval. A change arriving inside
+# the interval is held and the latest one is sent when the interval is up.
+#
+# A shard that identifies again starts from the presence the bot was created
+# with, forget() makes the next update go out to it.
+class PresenceUpdater:
+    def __init__(self, bot, budget, min_interval=60.0):
+        self.bot = bot
+        self.budget = budget
+        self.min_interval = min_interval
+        self._shown = {}  # shard_id -> rendered presence it has
+        self._last_sent = {}  # shard_id -> monotonic time of the last update
+        self._pending = None  # (activity, status) waiting for the interval
+        self._task = None
+
+    @staticmethod
+    def render(activity, status):
+        return (str(status), activity.type.value if activity else None, activity.name if activity else None)
+
+    def forget(self, shard_id):
+        self._shown.pop(shard_id, None)
+        self._last_sent.pop(shard_id, None)
+
+    async def update(self, activity, status=None):
+        rendered = self.render(activity, status)
+        now = time.monotonic()
+        sent = waiting = False
+        for shard_id in list(self.bot.shards):
+            if self._shown.get(shard_id) == rendered:
+                continue
+            if now - self._last_sent.get(shard_id, float("-inf")) < self.min_interval:
+                waiting = True
+                continue
+            if self.budget.available(shard_id) <= 0:
+                waiting = True
+                metrics.inc("presence_updates_total", result="over_budget")
+                continue
+            await self.bot.change_presence(activity=activity, status=status, shard_id=shard_id)
+            self.budget.record(shard_id, "presence")
+            self._shown[shard_id] = rendered
+            self._last_sent[shard_id] = time.monotonic()
+            metrics.inc("presence_updates_total", result="sent")
+            sent = True
+
+        if waiting:
+            metrics.inc("presence_updates_total", result="debounced")
+            self._pending = (activity, status)
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._send_pending())
+        else:
+            if not sent:
+                metrics.inc("presence_updates_total", result="unchanged")
+            self._pending = None
+
+    async def _send_pending(self):
+        await asyncio.sleep(self.min_interval)
+        if self._pending is not None:
+            activity, status = self._pending
+            self._pending = None
+            await self.update(activity, status)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
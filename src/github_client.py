@@ -0,0 +1,136 @@
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from metrics import registry
+
+GITHUB_API = "https://api.github.com"
+
+class GitHubResponse:
+    def __init__(self, status, data, headers, text="", not_modified=False):
+        self.status = status
+        self.data = data
+        self.headers = headers
+        self.text = text
+        self.not_modified = not_modified  # True when a 304 was answered from the ETag cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+# Async GitHub REST client.
+#
+# One keep-alive connection pool is shared by every call. GET responses are
+# remembered with their ETag and revalidated with If-None-Match, so a GET that
+# hasn't changed comes back as a 304 that doesn't count against the rate limit.
+# Rate-limit responses wait until the reset time, server errors and timeouts
+# are retried with exponential backoff.
+class GitHubClient:
+    def __init__(self, token=None, base_url=GITHUB_API, timeout=10, max_retries=3, pool_size=10, max_rate_limit_wait=60):
+        self.token = token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.pool_size = pool_size
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.rate_limit_remaining = None
+        self.rate_limit_reset = None
+        self._session = None
+        self._etags = {}  # url -> (etag, data)
+
+    def _headers(self):
+        headers = {"Accept": "application/vnd.github.v3+json"}
+        if self.token:
+            headers["Authorization"] = f"token {self.token}"
+        return headers
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self._headers(), timeout=self.timeout)
+        return self._session
+
+    @property
+    def rate_limited(self):
+        return self.rate_limit_remaining == 0 and self.rate_limit_reset is not None and self.rate_limit_reset > time.time()
+
+    def _rate_limit_delay(self, response):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            return float(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(response.headers.get("X-RateLimit-Reset", time.time() + 60))
+            return max(reset - time.time(), 1)
+        return None
+
+    async def request(self, method, path, json_data=None):
+        start = time.perf_counter()
+        response = await self._request(method, path, json_data)
+        registry.observe("http_request_seconds", time.perf_counter() - start, service="github", method=method, status=response.status)
+        return response
+
+    async def _request(self, method, path, json_data=None):
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        headers = {}
+        cached = self._etags.get(url) if method == "GET" else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.request(method, url, headers=headers, json=json_data) as response:
+                    if "X-RateLimit-Remaining" in response.headers:
+                        self.rate_limit_remaining = int(response.headers["X-RateLimit-Remaining"])
+                        self.rate_limit_reset = float(response.headers.get("X-RateLimit-Reset", 0))
+
+                    if response.status == 304 and cached:
+                        return GitHubResponse(200, cached[1], response.headers, not_modified=True)
+
+                    text = await response.text()
+
+                    if response.status in (403, 429):
+                        delay = self._rate_limit_delay(response)
+                        if delay is not None and delay <= self.max_rate_limit_wait and attempt < self.max_retries:
+                            await asyncio.sleep(delay)
+                            continue
+                        return GitHubResponse(response.status, None, response.headers, text)
+
+                    if response.status >= 500 and attempt < self.max_retries:
+                        await asyncio.sleep(2 ** attempt)
+                        continue
+
+                    data = json.loads(text) if text and response.content_type == "application/json" else None
+                    if method == "GET" and response.status == 200 and "ETag" in response.headers:
+                        self._etags[url] = (response.headers["ETag"], data)
+                    return GitHubResponse(response.status, data, response.headers, text)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.max_retries:
+                    return GitHubResponse(0, None, {}, f"{type(e).__name__}: {e}")
+                await asyncio.sleep(2 ** attempt)
+
+    async def get_commits(self, repo, branch=None):
+        path = f"/repos/{repo}/commits"
+        if branch:
+            path += f"?sha={branch}"
+        return await self.request("GET", path)
+
+    async def get_contents(self, repo, file_path, ref=None):
+        path = f"/repos/{repo}/contents/{file_path}"
+        if ref:
+            path += f"?ref={ref}"
+        return await self.request("GET", path)
+
+    async def put_contents(self, repo, file_path, content, message, sha=None, branch=None):
+        data = {"message": message, "content": content}
+        if sha:
+            data["sha"] = sha
+        if branch:
+            data["branch"] = branch
+        return await self.request("PUT", f"/repos/{repo}/contents/{file_path}", json_data=data)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
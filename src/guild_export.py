@@ -0,0 +1,151 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+
+from settings_cache import validate_guild_settings
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_REPORT_LIMIT = 20
+
+# Guild settings travel as NDJSON, one {"guild_id": "...", "settings": {...}}
+# per line, gzip compressed when the file name ends in .gz. Guilds are read,
+# written and imported one line or one batch at a time, so memory stays flat
+# however many guilds there are.
+
+def open_ndjson(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+# Function to decide whether a guild passes the export filters
+def guild_matches(guild_id, settings=None, min_id=None, max_id=None, fields=None):
+    if min_id is not None and int(guild_id) < min_id:
+        return False
+    if max_id is not None and int(guild_id) > max_id:
+        return False
+    if settings is not None and fields:
+        return all(settings.get(field) is not None for field in fields)
+    return True
+
+# Generator over (guild_id, settings) for every stored guild that passes the filters.
+# The ID range is checked before a guild is loaded.
+def iter_guild_settings(storage, min_id=None, max_id=None, fields=None):
+    for guild_id in storage.list_guilds():
+        if not guild_id.isdigit() or not guild_matches(guild_id, min_id=min_id, max_id=max_id):
+            continue
+        settings = storage.load_guild(guild_id)
+        if settings is not None and guild_matches(guild_id, settings, fields=fields):
+            yield guild_id, settings
+
+def export_guilds(storage, path, min_id=None, max_id=None, fields=None):
+    count = 0
+    with open_ndjson(path, "w") as f:
+        for guild_id, settings in iter_guild_settings(storage, min_id, max_id, fields):
+            f.write(json.dumps({"guild_id": guild_id, "settings": settings}, separators=(",", ":")) + "\n")
+            count += 1
+    return count
+
+# Function to append guilds to an export file, gzip files can be appended to as extra members
+def append_guilds(path, guilds):
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    with open_ndjson(path, "a") as f:
+        for guild_id, settings in guilds.items():
+            f.write(json.dumps({"guild_id": str(guild_id), "settings": settings}, separators=(",", ":")) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+class ImportReport:
+    def __init__(self):
+        self.applied = 0
+        self.invalid = []  # (line number, problem)
+        self.dry_run = False
+
+    def summary(self, limit=IMPORT_REPORT_LIMIT):
+        verb = "Would import" if self.dry_run else "Imported"
+        lines = [f"{verb} {self.applied} guild settings, skipped {len(self.invalid)} invalid lines."]
+        lines.extend(f"- line {number}: {problem}" for number, problem in self.invalid[:limit])
+        if len(self.invalid) > limit:
+            lines.append(f"- and {len(self.invalid) - limit} more")
+        return "\n".join(lines)
+
+def parse_record(line):
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return None, None, [f"not JSON ({e})"]
+    if not isinstance(record, dict) or "guild_id" not in record or "settings" not in record:
+        return None, None, ["expected an object with guild_id and settings"]
+    guild_id = str(record["guild_id"])
+    if not guild_id.isdigit():
+        return None, None, [f"guild_id {record['guild_id']!r} is not an ID"]
+    return guild_id, record["settings"], validate_guild_settings(record["settings"])
+
+# Function to validate an export and write it back in batches.
+# on_batch({guild_id: settings}) runs after every batch is stored, the bot uses it
+# to refresh its settings cache, progress(lines read) to report how far it got.
+def import_guilds(storage, path, batch_size=IMPORT_BATCH_SIZE, dry_run=False, on_batch=None, progress=None):
+    report = ImportReport()
+    report.dry_run = dry_run
+    batch = {}
+
+    def apply():
+        if not dry_run:
+            storage.save_guilds(batch)
+            if on_batch is not None:
+                on_batch(batch)
+        report.applied += len(batch)
+        batch.clear()
+
+    with open_ndjson(path, "r") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            guild_id, settings, problems = parse_record(line)
+            if problems:
+                report.invalid.append((number, "; ".join(problems)))
+                continue
+            batch[guild_id] = settings
+            if len(batch) >= batch_size:
+                apply()
+                if progress is not None:
+                    progress(number)
+    if batch:
+        apply()
+    return report
+
+def parse_fields(value):
+    return [field.strip() for field in value.split(",") if field.strip()] if value else None
+
+# Export or import guild settings from the command line, using the backend picked by STORAGE_BACKEND:
+#   python src/guild_export.py export guilds.ndjson.gz [--min-id ID] [--max-id ID] [--fields admin_role,...]
+#   python src/guild_export.py import guilds.ndjson.gz [--batch-size 500] [--dry-run]
+# Stop the bot first, or use !export and !import while it runs.
+if __name__ == "__main__":
+    from storage import create_storage
+
+    parser = argparse.ArgumentParser(description="Bulk export or import guild settings as (gzipped) NDJSON")
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("path")
+    parser.add_argument("--min-id", type=int)
+    parser.add_argument("--max-id", type=int)
+    parser.add_argument("--fields", help="only export guilds where all of these comma separated settings are set")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="validate the file without writing anything")
+    args = parser.parse_args()
+
+    storage = create_storage()
+    try:
+        if args.action == "export":
+            count = export_guilds(storage, args.path, args.min_id, args.max_id, parse_fields(args.fields))
+            print(f"Exported {count} guilds to {args.path} ({os.path.getsize(args.path)} bytes)")
+        else:
+            report = import_guilds(storage, args.path, args.batch_size, args.dry_run)
+            print(report.summary())
+            if report.invalid:
+                sys.exit(1)
+    finally:
+        storage.close()
@@ -0,0 +1,68 @@
+import os
+import time
+
+from guild_export import append_guilds
+from settings_cache import default_guild_settings
+
+GUILD_ARCHIVE_DIR = "database/archive/"
+GC_BATCH_SIZE = 500
+
+# Function to name the archive file guilds are appended to, one per month
+def archive_path(archive_dir=GUILD_ARCHIVE_DIR, now=None):
+    return os.path.join(archive_dir, time.strftime("guilds-%Y-%m.ndjson.gz", time.gmtime(now)))
+
+# Creates settings when the bot joins a guild and archives them when it
+# leaves. Archived guilds are appended to a monthly NDJSON export under
+# database/archive/, which !import or guild_export.py can bring back, and
+# then deleted from storage and the settings cache.
+#
+# collect() is the periodic pass for guilds left while the bot was offline.
+# A guild has to look orphaned on grace_passes passes in a row before it is
+# archived, so a guild that is only briefly unavailable is never touched.
+class GuildLifecycle:
+    def __init__(self, storage, settings, archive_dir=GUILD_ARCHIVE_DIR, grace_passes=2):
+        self.storage = storage
+        self.settings = settings  # GuildSettingsCache
+        self.archive_dir = archive_dir
+        self.grace_passes = grace_passes
+        self._suspects = {}  # guild_id -> consecutive passes it looked orphaned
+
+    def joined(self, guild_id):
+        if self.storage.load_guild(guild_id) is None:
+            self.settings.set(guild_id, default_guild_settings())
+
+    def archive(self, guild_ids):
+        # Pending changes go into the archive too
+        self.settings.flush()
+        batch = {}
+        for guild_id in guild_ids:
+            settings = self.storage.load_guild(guild_id)
+            if settings is not None:
+                batch[str(guild_id)] = settings
+        if batch:
+            append_guilds(archive_path(self.archive_dir), batch)
+        # Only delete what is safely in the archive
+        for guild_id in batch:
+            self.storage.delete_guild(guild_id)
+            self.settings.discard(guild_id)
+        return list(batch)
+
+    def left(self, guild_id):
+        self._suspects.pop(str(guild_id), None)
+        return self.archive([guild_id])
+
+    # is_orphan(guild_id) -> True when this process owns the guild and isn't in it
+    def collect(self, is_orphan):
+        suspects = {}
+        for guild_id in self.storage.list_guilds():
+            if guild_id.isdigit() and is_orphan(guild_id):
+                suspects[guild_id] = self._suspects.get(guild_id, 0) + 1
+        self._suspects = suspects
+
+        expired = [guild_id for guild_id, passes in suspects.items() if passes >= self.grace_passes]
+        archived = []
+        for start in range(0, len(expired), GC_BATCH_SIZE):
+            archived.extend(self.archive(expired[start:start + GC_BATCH_SIZE]))
+        for guild_id in archived:
+            self._suspects.pop(guild_id, None)
+        return archived
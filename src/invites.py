@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import discord
+
+# Invites the bot created, reused until shortly before they expire.
+#
+# get_many() looks up a batch of guilds at once; guilds without a usable
+# cached invite get a new one, at most `concurrency` create_invite calls at a
+# time, so a page of guilds costs one round of requests instead of one
+# request after another.
+class InviteCache:
+    def __init__(self, max_age=3600, concurrency=5, margin=300):
+        self.max_age = max_age  # lifetime of the invites we create, in seconds
+        self.margin = margin  # stop handing out an invite this long before it expires
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._entries = {}  # guild_id -> (url, expires_at)
+
+    def cached(self, guild_id):
+        entry = self._entries.get(guild_id)
+        if entry is None:
+            return None
+        url, expires_at = entry
+        if expires_at - self.margin <= time.monotonic():
+            del self._entries[guild_id]
+            return None
+        return url
+
+    def _invite_channel(self, guild):
+        # First text channel we are actually allowed to create invites in
+        for channel in guild.text_channels:
+            if channel.permissions_for(guild.me).create_instant_invite:
+                return channel
+        return None
+
+    async def get(self, guild):
+        # Returns an invite URL, or None when the bot can't create one in this guild
+        url = self.cached(guild.id)
+        if url is not None:
+            return url
+        channel = self._invite_channel(guild)
+        if channel is None:
+            return None
+        async with self._semaphore:
+            url = self.cached(guild.id)  # Another caller may have created one while we waited
+            if url is not None:
+                return url
+            try:
+                invite = await channel.create_invite(max_age=self.max_age, unique=False)
+            except Exception as e:
+                # Forbidden or a failed request, either way there is no invite to show
+                print(f"Failed to create an invite for guild {guild.id}: {e}")
+                return None
+        self._entries[guild.id] = (invite.url, self._expires_at(invite))
+        return invite.url
+
+    # unique=False can hand back an invite made earlier, count from when it was created
+    def _expires_at(self, invite):
+        if invite.max_age == 0:
+            return float("inf")  # never expires
+        max_age = invite.max_age if invite.max_age is not None else self.max_age
+        if invite.created_at is None:
+            return time.monotonic() + max_age
+        age = (discord.utils.utcnow() - invite.created_at).total_seconds()
+        return time.monotonic() + max_age - max(age, 0)
+
+    async def get_many(self, guilds):
+        urls = await asyncio.gather(*(self.get(guild) for guild in guilds))
+        return {guild.id: url for guild, url in zip(guilds, urls)}
+
+    def discard(self, guild_id):
+        self._entries.pop(guild_id, None)
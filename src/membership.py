@@ -0,0 +1,45 @@
+import threading
+
+# In-memory set of user IDs (staff or VIPs) with constant-time lookups.
+#
+# The members are held in a frozenset that is replaced as a whole, so readers
+# never see a half-built set and don't need a lock. refresh() only asks the
+# storage for a cheap change stamp and reloads when it differs from the one
+# the current set was built from. Mutations made by this process are
+# published straight into the set instead of waiting for a reload. They
+# leave the seen stamp alone, another process may have written since the
+# last refresh and the next refresh has to pick that up.
+class MembershipRegistry:
+    def __init__(self, loader, stamp):
+        self._loader = loader  # () -> [user_id, ...]
+        self._stamp = stamp  # () -> hashable value that changes whenever the stored list does
+        self._members = frozenset()
+        self._seen = None
+        self._lock = threading.Lock()  # serialises writers only
+
+    def __contains__(self, user_id):
+        return user_id in self._members
+
+    def __len__(self):
+        return len(self._members)
+
+    def __iter__(self):
+        return iter(self._members)
+
+    def refresh(self, force=False):
+        stamp = self._stamp()
+        if not force and stamp == self._seen:
+            return False
+        members = frozenset(self._loader())
+        with self._lock:
+            self._members = members
+            self._seen = stamp
+        return True
+
+    def publish_add(self, user_id):
+        with self._lock:
+            self._members = self._members | {user_id}
+
+    def publish_remove(self, user_id):
+        with self._lock:
+            self._members = self._members - {user_id}
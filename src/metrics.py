@@ -0,0 +1,216 @@
+import asyncio
+import functools
+import threading
+import time
+
+from aiohttp import web
+
+# Upper bounds (seconds) of the latency buckets, the last bucket catches everything else
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation, good enough for a dashboard
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float("inf")
+        return float("inf")
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+# Process-wide counters, gauges and latency histograms, keyed by metric name
+# and label set. Storage calls run in worker threads too, so every update
+# takes a lock.
+class MetricsRegistry:
+    def __init__(self):
+        self.counters = {}  # name -> {labels: value}
+        self.gauges = {}
+        self.histograms = {}  # name -> {labels: Histogram}
+        self.help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, seconds, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(seconds)
+
+    def snapshot(self):
+        # Copies of the series maps, safe to iterate while other threads keep recording
+        with self._lock:
+            return {
+                "counters": {name: dict(series) for name, series in self.counters.items()},
+                "gauges": {name: dict(series) for name, series in self.gauges.items()},
+                "histograms": {name: dict(series) for name, series in self.histograms.items()},
+            }
+
+    def timer(self, name, **labels):
+        return Timer(self, name, labels)
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(metrics.items()):
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in sorted(series.items()):
+                        lines.append(f"{name}{_format_labels(key)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                if name in self.help:
+                    lines.append(f"# HELP {name} {self.help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+class Timer:
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+# The registry every module reports to
+registry = MetricsRegistry()
+registry.describe("command_seconds", "Time spent running a command")
+registry.describe("command_errors_total", "Commands that raised an error")
+registry.describe("loop_seconds", "Time spent in one iteration of a background loop")
+registry.describe("loop_errors_total", "Background loop iterations that raised an error")
+registry.describe("storage_seconds", "Time spent in a storage backend call")
+registry.describe("http_request_seconds", "Time spent on an outgoing HTTP request, including retries")
+registry.describe("event_loop_lag_seconds", "How late the event loop woke up a sleeping task")
+
+# Wraps a storage backend so every method call is timed, attributes pass straight through
+class InstrumentedStorage:
+    def __init__(self, storage):
+        self._storage = storage
+        self._backend = type(storage).__name__
+
+    def __getattr__(self, name):
+        attribute = getattr(self._storage, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        @functools.wraps(attribute)
+        def timed(*args, **kwargs):
+            with registry.timer("storage_seconds", backend=self._backend, op=name):
+                return attribute(*args, **kwargs)
+        return timed
+
+    @property
+    def wrapped(self):
+        return self._storage
+
+# Measures how late asyncio.sleep wakes up, anything blocking the loop shows up here
+class LoopLagMonitor:
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(time.perf_counter() - start - self.interval, 0.0)
+            registry.observe("event_loop_lag_seconds", self.last_lag)
+            registry.set("event_loop_lag_last_seconds", self.last_lag)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+# Local HTTP endpoint serving the registry in Prometheus format
+class MetricsServer:
+    def __init__(self, host="127.0.0.1", port=9100, path="/metrics"):
+        self.host = host
+        self.port = port
+        self.path = path
+        self._runner = None
+
+    async def handle(self, request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get(self.path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"Serving metrics on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+class GuildPermissions:
+    def __init__(self, owner_id, administrator_roles, everyone_is_administrator, admin_role_id):
+        self.owner_id = owner_id
+        self.administrator_roles = administrator_roles  # frozenset of role IDs with the Administrator permission
+        self.everyone_is_administrator = everyone_is_administrator
+        self.admin_role_id = admin_role_id  # the configured admin role, None when unset or deleted
+
+    @classmethod
+    def resolve(cls, guild, settings):
+        administrator_roles = frozenset(role.id for role in guild.roles if role.permissions.administrator and not role.is_default())
+        admin_role_id = settings.get("admin_role")
+        if admin_role_id is not None and guild.get_role(admin_role_id) is None:
+            admin_role_id = None
+        return cls(guild.owner_id, administrator_roles, guild.default_role.permissions.administrator, admin_role_id)
+
+    def is_administrator(self, member):
+        if member.id == self.owner_id or self.everyone_is_administrator:
+            return True
+        return any(member.get_role(role_id) is not None for role_id in self.administrator_roles)
+
+    def is_admin(self, member):
+        return self.is_administrator(member) or (self.admin_role_id is not None and member.get_role(self.admin_role_id) is not None)
+
+# Resolved admin-role and Administrator-permission data per guild, so an
+# admin check is one dict lookup plus a look at the member's own role list.
+#
+# Only guild-level state is kept: the roles a member has arrive with every
+# message and interaction, so nothing per member can go stale without the
+# members intent. Entries are dropped when the guild's roles, owner or
+# settings change and rebuilt on the next check.
+class PermissionIndex:
+    def __init__(self, settings, max_size=1000):
+        self._settings = settings  # GuildSettingsCache
+        self.max_size = max_size
+        self._entries = OrderedDict()  # guild_id -> GuildPermissions
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, guild):
+        with self._lock:
+            entry = self._entries.get(guild.id)
+            if entry is not None:
+                self._entries.move_to_end(guild.id)
+                return entry
+
+        entry = GuildPermissions.resolve(guild, self._settings.get(guild.id))
+        with self._lock:
+            self._entries[guild.id] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def is_administrator(self, member):
+        return self.get(member.guild).is_administrator(member)
+
+    # Administrator permission or the guild's configured admin role
+    def is_admin(self, member):
+        return self.get(member.guild).is_admin(member)
+
+    def invalidate(self, guild_id):
+        with self._lock:
+            self._entries.pop(int(guild_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,88 @@
+import asyncio
+import collections
+import sys
+import threading
+import time
+import traceback
+
+from metrics import registry
+
+# Watches the event loop from a separate thread.
+#
+# A task on the loop stamps a heartbeat every few milliseconds. If the stamp
+# gets older than threshold seconds, something is holding the loop (blocking
+# file I/O, a synchronous HTTP call, a heavy computation), and the thread logs
+# the loop thread's current stack, which is the code doing the blocking.
+class LoopWatchdog:
+    def __init__(self, threshold=0.25):
+        self.threshold = threshold
+        self._beat = time.monotonic()
+        self._loop_thread_id = None
+        self._task = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.threshold / 4)
+
+    def _watch(self):
+        reported = None  # heartbeat of the stall already reported
+        while not self._stop.wait(self.threshold / 4):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold:
+                if reported is not None:
+                    print(f"Event loop unblocked after {time.monotonic() - reported:.3f}s")
+                    reported = None
+                continue
+            if reported == beat:
+                continue
+            reported = beat
+            registry.inc("event_loop_blocked_total")
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "  (stack unavailable)\n"
+            print(f"Event loop blocked for {stalled:.3f}s (threshold {self.threshold}s), loop thread is at:\n{stack}", end="")
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        print(f"Event loop watchdog started, threshold {self.threshold}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+# Function to fold a frame into "outer;inner;innermost", the collapsed-stack
+# line format flamegraph.pl, speedscope and inferno read
+def _fold(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+# Function to sample a thread's stack every interval seconds for duration seconds.
+# Runs on its own thread so the sampled thread keeps going; returns {folded stack: samples}.
+def sample_stacks(thread_id, duration, interval=0.005):
+    samples = collections.Counter()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            samples[_fold(frame)] += 1
+        time.sleep(interval)
+    return samples
+
+def format_folded(samples):
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import time
+
+from discord.ext import commands
+
+# Source files the extensions are loaded from
+COGS_PACKAGE = "cogs"
+COGS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), COGS_PACKAGE)
+
+
+def file_hash(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+class ReloadReport:
+    def __init__(self):
+        self.reloaded = {}  # extension -> seconds
+        self.loaded = {}
+        self.unloaded = {}
+        self.failed = {}  # extension -> error message, the previous version stays active
+        self.core_changed = []
+        self.total = 0.0
+
+    @property
+    def changed(self):
+        return bool(self.reloaded or self.loaded or self.unloaded or self.failed)
+
+    def summary(self):
+        parts = []
+        for label, timings in (("reloaded", self.reloaded), ("loaded", self.loaded), ("unloaded", self.unloaded)):
+            for name, seconds in timings.items():
+                parts.append(f"{label} {name} in {seconds * 1000:.1f}ms")
+        for name, error in self.failed.items():
+            parts.append(f"failed {name} (rolled back): {error}")
+        if self.core_changed:
+            parts.append(f"core modules changed: {', '.join(self.core_changed)}")
+        if not parts:
+            return "No command modules changed."
+        return f"{'; '.join(parts)}. Total {self.total * 1000:.1f}ms."
+
+# Loads every module in src/cogs as a bot extension and reloads only the ones
+# whose source changed since they were last loaded. discord.py keeps the old
+# version of an extension when its reload raises, so a broken module is rolled
+# back instead of taking its commands down.
+class ExtensionReloader:
+    def __init__(self, bot, cogs_dir=COGS_DIR, package=COGS_PACKAGE, core_dir=None):
+        self.bot = bot
+        self.cogs_dir = cogs_dir
+        self.package = package
+        self.core_dir = core_dir or os.path.dirname(cogs_dir)
+        self._hashes = {}  # extension -> hash of the loaded source
+        self._core_hashes = {}
+        self.last_report = None
+
+    def _extension_files(self):
+        files = {}
+        for name in sorted(os.listdir(self.cogs_dir)):
+            if name.endswith(".py") and not name.startswith("_"):
+                files[f"{self.package}.{name[:-3]}"] = os.path.join(self.cogs_dir, name)
+        return files
+
+    # Every module next to bot.py lives for the whole process. The gateway
+    # session, caches and storage handles belong to them, so a change there
+    # still needs a restart.
+    def _core_stamp(self):
+        names = [name for name in os.listdir(self.core_dir) if name.endswith(".py")]
+        return {name: file_hash(os.path.join(self.core_dir, name)) for name in sorted(names)}
+
+    async def load_all(self):
+        start = time.perf_counter()
+        for extension, path in self._extension_files().items():
+            await self.bot.load_extension(extension)
+            self._hashes[extension] = file_hash(path)
+        self._core_hashes = self._core_stamp()
+        print(f"Loaded {len(self._hashes)} command modules in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    async def reload_changed(self):
+        report = ReloadReport()
+        start = time.perf_counter()
+        files = self._extension_files()
+
+        for extension in list(self._hashes):
+            if extension not in files:
+                step = time.perf_counter()
+                try:
+                    await self.bot.unload_extension(extension)
+                except commands.ExtensionNotLoaded:
+                    pass
+                del self._hashes[extension]
+                report.unloaded[extension] = time.perf_counter() - step
+
+        for extension, path in files.items():
+            digest = file_hash(path)
+            if digest == self._hashes.get(extension):
+                continue
+            new = extension not in self._hashes
+            step = time.perf_counter()
+            try:
+                if new:
+                    await self.bot.load_extension(extension)
+                else:
+                    await self.bot.reload_extension(extension)
+            except commands.ExtensionError as e:
+                # A failed load leaves nothing behind, a failed reload keeps the old version
+                report.failed[extension] = str(e.__cause__ or e)
+                continue
+            self._hashes[extension] = digest
+            if new:
+                report.loaded[extension] = time.perf_counter() - step
+            else:
+                report.reloaded[extension] = time.perf_counter() - step
+
+        current = self._core_stamp()
+        names = sorted(set(current) | set(self._core_hashes))
+        report.core_changed = [name for name in names if current.get(name) != self._core_hashes.get(name)]
+        report.total = time.perf_counter() - start
+        self.last_report = report
+        return report
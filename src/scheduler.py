@@ -0,0 +1,129 @@
+import asyncio
+import random
+import time
+
+from metrics import registry as metrics
+
+# Share of the interval every wait is randomly stretched or shortened by
+JOB_JITTER = 0.1
+# Longest wait between two attempts of a failing job, unless its interval is longer
+JOB_MAX_BACKOFF = 900.0
+# A run taking this many intervals counts as stalled in the health report
+JOB_STALL_INTERVALS = 5
+
+metrics.describe("job_runs_total", "Scheduled job runs, by job and result (ok, error or skipped)")
+metrics.describe("job_failures", "Failures in a row of a scheduled job, 0 once it succeeds again")
+
+class Job:
+    def __init__(self, name, func, interval, jitter=JOB_JITTER, max_backoff=JOB_MAX_BACKOFF):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max(max_backoff, interval)
+        self.failures = 0  # in a row
+        self.runs = 0
+        self.errors = 0
+        self.skipped = 0
+        self.last_started = None  # time.time() of the last run
+        self.last_duration = None
+        self.last_error = None
+        self.next_run = None  # time.time() the next run is due
+        self._runner = None  # the task waiting for the next run
+        self._run = None  # the task of the current run
+
+    @property
+    def started(self):
+        return self._runner is not None and not self._runner.done()
+
+    @property
+    def running(self):
+        return self._run is not None and not self._run.done()
+
+    # Seconds until the next run: the interval, doubled for every failure in a row, with jitter
+    def next_delay(self):
+        delay = min(self.interval * 2 ** min(self.failures, 32), self.max_backoff)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    @property
+    def health(self):
+        if not self.started:
+            return "stopped"
+        if self.running and time.time() - self.last_started > self.interval * JOB_STALL_INTERVALS:
+            return "stalled"
+        if self.failures:
+            return "failing"
+        if self.runs == 0:
+            return "waiting"
+        return "ok"
+
+# Runs the bot's periodic jobs, each on its own interval.
+#
+# Every wait gets some jitter so the jobs don't wake up in lockstep, and the
+# first run is spread over the first jitter share of the interval. A job that
+# raises is logged and retried with exponential backoff up to max_backoff
+# instead of dying, and a tick that comes while the previous run is still
+# going is skipped rather than stacking runs. !jobs shows the health of each.
+class JobScheduler:
+    def __init__(self):
+        self.jobs = {}
+
+    def job(self, name, seconds, jitter=JOB_JITTER, max_backoff=JOB_MAX_BACKOFF):
+        def decorator(func):
+            self.add(name, func, seconds, jitter=jitter, max_backoff=max_backoff)
+            return func
+        return decorator
+
+    def add(self, name, func, seconds, jitter=JOB_JITTER, max_backoff=JOB_MAX_BACKOFF):
+        if name in self.jobs:
+            raise ValueError(f"Job {name} is already registered")
+        self.jobs[name] = Job(name, func, seconds, jitter, max_backoff)
+
+    def start(self, name):
+        job = self.jobs[name]
+        if not job.started:
+            job._runner = asyncio.create_task(self._tick(job))
+
+    async def _tick(self, job):
+        delay = random.uniform(0, job.interval * job.jitter)
+        while True:
+            job.next_run = time.time() + delay
+            await asyncio.sleep(delay)
+            started = time.monotonic()
+            if job.running:
+                job.skipped += 1
+                metrics.inc("job_runs_total", job=job.name, result="skipped")
+            else:
+                job._run = asyncio.create_task(self._execute(job))
+                # Wait for quick runs so a failure already counts towards the next wait
+                await asyncio.wait({job._run}, timeout=job.interval)
+            delay = max(job.next_delay() - (time.monotonic() - started), 0)
+
+    async def _execute(self, job):
+        job.last_started = time.time()
+        start = time.perf_counter()
+        try:
+            await job.func()
+        except Exception as e:
+            job.failures += 1
+            job.errors += 1
+            job.last_error = f"{type(e).__name__}: {e}"
+            metrics.inc("job_runs_total", job=job.name, result="error")
+            metrics.inc("loop_errors_total", loop=job.name)
+            print(f"Job {job.name} failed ({job.failures} in a row): {job.last_error}")
+        else:
+            job.failures = 0
+            metrics.inc("job_runs_total", job=job.name, result="ok")
+        finally:
+            job.runs += 1
+            job.last_duration = time.perf_counter() - start
+            metrics.observe("loop_seconds", job.last_duration, loop=job.name)
+            metrics.set("job_failures", job.failures, job=job.name)
+
+    def stop(self):
+        for job in self.jobs.values():
+            for task in (job._runner, job._run):
+                if task is not None:
+                    task.cancel()
+            job._runner = job._run = None
+            job.next_run = None
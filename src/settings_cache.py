@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from collections import OrderedDict
+
+# Settings every guild starts with before anything is configured
+DEFAULT_GUILD_SETTINGS = {
+    "welcome_channel": None,
+    "admin_role": None,
+    "suggestion_channel": None,
+    "verified": None
+}
+
+def default_guild_settings():
+    return dict(DEFAULT_GUILD_SETTINGS)
+
+# Function to list what is wrong with a stored settings document, empty when it is valid.
+# Every setting is a Discord ID or unset.
+def validate_guild_settings(settings):
+    if not isinstance(settings, dict):
+        return [f"expected an object, got {type(settings).__name__}"]
+    problems = []
+    for key, value in settings.items():
+        if key not in DEFAULT_GUILD_SETTINGS:
+            problems.append(f"unknown key {key!r}")
+        elif value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            problems.append(f"{key} should be an ID, got {value!r}")
+    return problems
+
+# Process-wide write-behind cache for guild settings.
+#
+# Reads are served from memory after the first load of a guild. Writes only
+# update memory and mark the guild dirty; flush() writes every dirty guild in
+# one batch. Clean guilds are evicted least-recently-used once the cache grows
+# past max_size, dirty guilds are never evicted before they are flushed, and
+# guilds being flushed stay pinned until the write has returned.
+class GuildSettingsCache:
+    def __init__(self, loader, writer, max_size=1000):
+        self._loader = loader  # guild_id -> settings dict, or None if the guild has none stored
+        self._writer = writer  # {guild_id: settings} -> None, writes a batch of guilds
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._dirty = set()
+        self._flushing = set()  # keys whose write is in flight
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # one batch at a time, so an older batch never lands after a newer one
+        self._listeners = []  # called with the guild ID whenever a guild's settings change
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _changed(self, keys):
+        for callback in self._listeners:
+            for key in keys:
+                callback(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, guild_id):
+        return str(guild_id) in self._entries
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    def get(self, guild_id):
+        key = str(guild_id)
+        with self._lock:
+            settings = self._entries.get(key)
+            if settings is not None:
+                self._entries.move_to_end(key)
+                return dict(settings)
+
+        settings = self._loader(key)
+        if settings is None:
+            settings = default_guild_settings()
+
+        with self._lock:
+            # Another caller may have stored the guild while we were loading it
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return dict(self._entries[key])
+            self._entries[key] = settings
+            self._evict()
+            return dict(settings)
+
+    def set(self, guild_id, settings):
+        key = str(guild_id)
+        with self._lock:
+            self._entries[key] = dict(settings)
+            self._entries.move_to_end(key)
+            self._dirty.add(key)
+            self._evict()
+        self._changed([key])
+
+    def update(self, guild_id, key, value):
+        settings = self.get(guild_id)
+        settings[key] = value
+        self.set(guild_id, settings)
+
+    def load_many(self, batch):
+        # Swap freshly loaded guilds in under one lock, guilds changed since the batch was read keep their changes
+        changed = []
+        with self._lock:
+            for guild_id, settings in batch.items():
+                key = str(guild_id)
+                if key in self._dirty or key in self._flushing:
+                    continue
+                self._entries[key] = dict(settings)
+                self._entries.move_to_end(key)
+                changed.append(key)
+            self._evict()
+        self._changed(changed)
+
+    def discard(self, guild_id):
+        # Forget a guild without writing it, pending changes are dropped
+        key = str(guild_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._dirty.discard(key)
+        self._changed([key])
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                batch = {key: dict(self._entries[key]) for key in self._dirty if key in self._entries}
+                self._dirty.clear()
+                self._flushing.update(batch)
+
+            try:
+                self._writer(batch)
+            except Exception:
+                # Put the batch back so the next flush retries it, unless newer changes already did
+                with self._lock:
+                    for key, settings in batch.items():
+                        if key not in self._dirty:
+                            self._entries.setdefault(key, settings)
+                            self._dirty.add(key)
+                raise
+            finally:
+                with self._lock:
+                    self._flushing.clear()
+                    self._evict()
+            return len(batch)
+
+    async def flush_async(self):
+        # Run the disk writes off the event loop
+        return await asyncio.to_thread(self.flush)
+
+    def _evict(self):
+        overflow = len(self._entries) - self.max_size
+        if overflow <= 0:
+            return
+        for key in list(self._entries):
+            if overflow <= 0:
+                break
+            if key in self._dirty or key in self._flushing:
+                continue
+            del self._entries[key]
+            overflow -= 1
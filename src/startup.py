@@ -0,0 +1,101 @@
+import asyncio
+import inspect
+import time
+
+class Phase:
+    def __init__(self, name, func, after=(), once=True):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+        self.once = once  # run once per process, not on every reconnect
+        self.done = False
+
+# Runs the bot's startup work as named phases with dependencies.
+#
+# Each phase starts as soon as the phases it comes after have finished, so
+# independent phases run concurrently. Phases marked once are skipped on
+# later runs (on_ready fires again after every reconnect) once they have
+# succeeded; a failed phase is retried on the next run and the phases that
+# depend on it are skipped. Every run logs how long each phase took.
+class StartupOrchestrator:
+    def __init__(self, started_at=None):
+        self.phases = {}
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.timings = {}  # phase name -> seconds, from the last run
+        self.runs = 0
+        self._lock = asyncio.Lock()
+
+    def phase(self, name, after=(), once=True):
+        def decorator(func):
+            self.add(name, func, after=after, once=once)
+            return func
+        return decorator
+
+    def add(self, name, func, after=(), once=True):
+        if name in self.phases:
+            raise ValueError(f"Startup phase {name} is already registered")
+        self.phases[name] = Phase(name, func, after, once)
+
+    def _check(self):
+        for phase in self.phases.values():
+            for dependency in phase.after:
+                if dependency not in self.phases:
+                    raise ValueError(f"Startup phase {phase.name} depends on unknown phase {dependency}")
+        # Depth-first walk to reject cycles before anything runs
+        visiting, visited = set(), set()
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Startup phases have a cycle through {name}")
+            visiting.add(name)
+            for dependency in self.phases[name].after:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+        for name in self.phases:
+            visit(name)
+
+    async def _run_phase(self, phase, tasks):
+        if phase.after:
+            results = await asyncio.gather(*(tasks[name] for name in phase.after))
+            if not all(results):
+                print(f"Skipping startup phase {phase.name}, a phase it depends on failed.")
+                return False
+        if phase.once and phase.done:
+            return True
+
+        start = time.perf_counter()
+        try:
+            result = phase.func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Startup phase {phase.name} failed: {e}")
+            return False
+        finally:
+            self.timings[phase.name] = time.perf_counter() - start
+        phase.done = True
+        return True
+
+    async def run(self):
+        # Overlapping on_ready events wait for the run in progress instead of starting phases twice
+        async with self._lock:
+            self._check()
+            self.runs += 1
+            self.timings = {}
+            start = time.perf_counter()
+            tasks = {}
+            for phase in self.phases.values():
+                tasks[phase.name] = asyncio.ensure_future(self._run_phase(phase, tasks))
+            results = await asyncio.gather(*tasks.values())
+            elapsed = time.perf_counter() - start
+            print(self.report(elapsed))
+            return all(results)
+
+    def report(self, elapsed):
+        breakdown = ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]))
+        report = f"Startup run {self.runs}: {elapsed * 1000:.1f}ms ({breakdown or 'nothing to do'})"
+        if self.runs == 1:
+            report += f", ready {time.perf_counter() - self.started_at:.2f}s after process start"
+        return report
@@ -0,0 +1,647 @@
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+# Default locations of the bot's persisted state
+SETTINGS_DIR = "database/guilds/"
+DATA_DIR = "database/users/vipdata.json"
+STAFF_FILE = "database/data.json"
+APPEALS_FILE = "appeals.json"
+SQLITE_PATH = "database/divine.db"
+JOURNAL_DIR = "database/journal/"
+
+# Storage backends all expose the same methods:
+#
+#   load_guild(guild_id) -> dict or None    save_guilds({guild_id: settings})
+#   delete_guild(guild_id)                  list_guilds() -> [guild_id, ...]
+#   load_staff() -> [user_id, ...]          save_staff(user_ids), add_staff(id), remove_staff(id)
+#   load_vips() -> [user_id, ...]           save_vips(user_ids), add_vip(id), remove_vip(id)
+#   load_appeals() -> {channel_id: user_id} save_appeal(channel_id, user_id), remove_appeal(channel_id)
+#   stamp(name) -> value that changes whenever "staff" or "vips" is written
+#   close()
+#
+# Guild, channel and user IDs are returned the same way the JSON files have
+# always stored them, so callers don't care which backend is active.
+
+# Function to pick the subdirectory of database/guilds a guild's file lives in.
+# Two hex characters of a hash spread guilds evenly over 256 directories, so
+# no directory grows past a few hundred files even with 100k+ guilds.
+def guild_shard(guild_id):
+    return hashlib.blake2b(str(guild_id).encode(), digest_size=1).hexdigest()
+
+# Function to replace a JSON file in one step, a crash leaves either the old or the new file.
+# The temporary file is per process and thread so cluster workers writing at once don't collide.
+def write_json_atomic(path, data, indent=4):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# One JSON document per guild, in the subdirectory guild_shard() picks, plus one file each for staff, VIPs and appeals
+class JsonStorage:
+    def __init__(self, settings_dir=SETTINGS_DIR, staff_file=STAFF_FILE, vip_file=DATA_DIR, appeals_file=APPEALS_FILE):
+        self.settings_dir = settings_dir
+        self.staff_file = staff_file
+        self.vip_file = vip_file
+        self.appeals_file = appeals_file
+        self._lock = threading.Lock()
+
+        # Ensure the guilds directory exists
+        if not os.path.exists(self.settings_dir):
+            os.makedirs(self.settings_dir)
+        self._shards = set()  # shard directories known to exist
+        self._migrate_flat_layout()
+
+        if not os.path.exists(self.vip_file):
+            self._write_json(self.vip_file, {"vips": []})
+
+        # Ensure the staff file exists, or create it with an empty list
+        if not os.path.exists(self.staff_file):
+            self._write_json(self.staff_file, {"staff": []})
+
+    def _read_json(self, path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_json(self, path, data, indent=4):
+        write_json_atomic(path, data, indent=indent)
+
+    def guild_path(self, guild_id):
+        return os.path.join(self.settings_dir, guild_shard(guild_id), f"{guild_id}.json")
+
+    def _ensure_shard(self, guild_id):
+        shard = guild_shard(guild_id)
+        if shard not in self._shards:
+            os.makedirs(os.path.join(self.settings_dir, shard), exist_ok=True)
+            self._shards.add(shard)
+
+    # Guild files from before the sharded layout sit directly in settings_dir, move them once.
+    # Cluster workers start at the same time and may all migrate, a file another worker
+    # already moved is skipped.
+    def _migrate_flat_layout(self):
+        moved = 0
+        with os.scandir(self.settings_dir) as entries:
+            flat = [entry.name for entry in entries if entry.is_file() and entry.name.endswith(".json")]
+        for name in flat:
+            guild_id = name[:-5]
+            self._ensure_shard(guild_id)
+            try:
+                os.replace(os.path.join(self.settings_dir, name), self.guild_path(guild_id))
+            except FileNotFoundError:
+                continue
+            moved += 1
+        if moved:
+            print(f"Moved {moved} guild settings files into {self.settings_dir} shard directories")
+
+    # Guild settings
+    def load_guild(self, guild_id):
+        return self._read_json(self.guild_path(guild_id), None)
+
+    def save_guilds(self, batch):
+        with self._lock:
+            for guild_id, settings in batch.items():
+                self._ensure_shard(guild_id)
+                self._write_json(self.guild_path(guild_id), settings)
+
+    def delete_guild(self, guild_id):
+        with self._lock:
+            path = self.guild_path(guild_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def list_guilds(self):
+        guild_ids = []
+        with os.scandir(self.settings_dir) as shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    guild_ids.extend(entry.name[:-5] for entry in entries if entry.name.endswith(".json"))
+        return guild_ids
+
+    # Staff
+    def load_staff(self):
+        return self._read_json(self.staff_file, {}).get("staff", [])
+
+    def save_staff(self, user_ids):
+        with self._lock:
+            self._write_json(self.staff_file, {"staff": list(user_ids)})
+
+    def add_staff(self, user_id):
+        with self._lock:
+            staff = self._read_json(self.staff_file, {}).get("staff", [])
+            if user_id in staff:
+                return False
+            staff.append(user_id)
+            self._write_json(self.staff_file, {"staff": staff})
+            return True
+
+    def remove_staff(self, user_id):
+        with self._lock:
+            staff = self._read_json(self.staff_file, {}).get("staff", [])
+            if user_id not in staff:
+                return False
+            staff.remove(user_id)
+            self._write_json(self.staff_file, {"staff": staff})
+            return True
+
+    # VIPs
+    def load_vips(self):
+        return self._read_json(self.vip_file, {}).get("vips", [])
+
+    def save_vips(self, user_ids):
+        with self._lock:
+            self._write_json(self.vip_file, {"vips": list(user_ids)})
+
+    def add_vip(self, user_id):
+        with self._lock:
+            vips = self._read_json(self.vip_file, {}).get("vips", [])
+            if user_id in vips:
+                return False
+            vips.append(user_id)
+            self._write_json(self.vip_file, {"vips": vips})
+            return True
+
+    def remove_vip(self, user_id):
+        with self._lock:
+            vips = self._read_json(self.vip_file, {}).get("vips", [])
+            if user_id not in vips:
+                return False
+            vips.remove(user_id)
+            self._write_json(self.vip_file, {"vips": vips})
+            return True
+
+    # Appeals
+    def load_appeals(self):
+        return self._read_json(self.appeals_file, {})
+
+    # Change stamps, a stat is much cheaper than parsing the file again
+    def stamp(self, name):
+        path = {"staff": self.staff_file, "vips": self.vip_file}[name]
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def save_appeal(self, channel_id, user_id):
+        with self._lock:
+            appeals = self._read_json(self.appeals_file, {})
+            appeals[str(channel_id)] = str(user_id)
+            self._write_json(self.appeals_file, appeals, indent=None)
+
+    def remove_appeal(self, channel_id):
+        with self._lock:
+            appeals = self._read_json(self.appeals_file, {})
+            appeals.pop(str(channel_id), None)
+            self._write_json(self.appeals_file, appeals, indent=None)
+
+    def close(self):
+        pass
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS staff (
+    user_id INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS vips (
+    user_id INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS appeals (
+    channel_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS appeals_user_id ON appeals (user_id);
+"""
+
+# Statements are kept as constants so sqlite's statement cache reuses the compiled form
+SQL_LOAD_GUILD = "SELECT data FROM guild_settings WHERE guild_id = ?"
+SQL_SAVE_GUILD = "INSERT INTO guild_settings (guild_id, data, updated_at) VALUES (?, ?, ?) ON CONFLICT (guild_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at"
+SQL_DELETE_GUILD = "DELETE FROM guild_settings WHERE guild_id = ?"
+SQL_LIST_GUILDS = "SELECT guild_id FROM guild_settings"
+SQL_LOAD_STAFF = "SELECT user_id FROM staff ORDER BY rowid"
+SQL_ADD_STAFF = "INSERT OR IGNORE INTO staff (user_id) VALUES (?)"
+SQL_REMOVE_STAFF = "DELETE FROM staff WHERE user_id = ?"
+SQL_CLEAR_STAFF = "DELETE FROM staff"
+SQL_LOAD_VIPS = "SELECT user_id FROM vips ORDER BY rowid"
+SQL_ADD_VIP = "INSERT OR IGNORE INTO vips (user_id) VALUES (?)"
+SQL_REMOVE_VIP = "DELETE FROM vips WHERE user_id = ?"
+SQL_CLEAR_VIPS = "DELETE FROM vips"
+SQL_LOAD_APPEALS = "SELECT channel_id, user_id FROM appeals"
+SQL_SAVE_APPEAL = "INSERT OR REPLACE INTO appeals (channel_id, user_id) VALUES (?, ?)"
+SQL_REMOVE_APPEAL = "DELETE FROM appeals WHERE channel_id = ?"
+
+# Single SQLite database in WAL mode, every mutation only touches the rows it changes
+class SqliteStorage:
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # The settings cache flushes from a worker thread, so the connection is shared behind a lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, cached_statements=64)
+        self._lock = threading.Lock()
+        self._local_versions = {}  # "staff"/"vips" -> number of writes made through this connection
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SQLITE_SCHEMA)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _transaction(self, statements):
+        # statements: [(sql, params or [params, ...], many)]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = 0
+                for sql, params, many in statements:
+                    cursor = self._conn.executemany(sql, params) if many else self._conn.execute(sql, params)
+                    changed += cursor.rowcount
+                self._conn.execute("COMMIT")
+                return changed
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _bump(self, name):
+        with self._lock:
+            self._local_versions[name] = self._local_versions.get(name, 0) + 1
+
+    # Guild settings
+    def load_guild(self, guild_id):
+        rows = self._query(SQL_LOAD_GUILD, (int(guild_id),))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_guilds(self, batch):
+        if not batch:
+            return
+        now = time.time()
+        rows = [(int(guild_id), json.dumps(settings), now) for guild_id, settings in batch.items()]
+        self._transaction([(SQL_SAVE_GUILD, rows, True)])
+
+    def delete_guild(self, guild_id):
+        self._transaction([(SQL_DELETE_GUILD, (int(guild_id),), False)])
+
+    def list_guilds(self):
+        return [str(row[0]) for row in self._query(SQL_LIST_GUILDS)]
+
+    # Staff
+    def load_staff(self):
+        return [row[0] for row in self._query(SQL_LOAD_STAFF)]
+
+    def save_staff(self, user_ids):
+        self._transaction([(SQL_CLEAR_STAFF, (), False), (SQL_ADD_STAFF, [(int(i),) for i in user_ids], True)])
+        self._bump("staff")
+
+    def add_staff(self, user_id):
+        changed = self._transaction([(SQL_ADD_STAFF, (int(user_id),), False)]) > 0
+        if changed:
+            self._bump("staff")
+        return changed
+
+    def remove_staff(self, user_id):
+        changed = self._transaction([(SQL_REMOVE_STAFF, (int(user_id),), False)]) > 0
+        if changed:
+            self._bump("staff")
+        return changed
+
+    # VIPs
+    def load_vips(self):
+        return [row[0] for row in self._query(SQL_LOAD_VIPS)]
+
+    def save_vips(self, user_ids):
+        self._transaction([(SQL_CLEAR_VIPS, (), False), (SQL_ADD_VIP, [(int(i),) for i in user_ids], True)])
+        self._bump("vips")
+
+    def add_vip(self, user_id):
+        changed = self._transaction([(SQL_ADD_VIP, (int(user_id),), False)]) > 0
+        if changed:
+            self._bump("vips")
+        return changed
+
+    def remove_vip(self, user_id):
+        changed = self._transaction([(SQL_REMOVE_VIP, (int(user_id),), False)]) > 0
+        if changed:
+            self._bump("vips")
+        return changed
+
+    # Appeals
+    def load_appeals(self):
+        return {str(channel_id): str(user_id) for channel_id, user_id in self._query(SQL_LOAD_APPEALS)}
+
+    def save_appeal(self, channel_id, user_id):
+        self._transaction([(SQL_SAVE_APPEAL, (int(channel_id), int(user_id)), False)])
+
+    def remove_appeal(self, channel_id):
+        self._transaction([(SQL_REMOVE_APPEAL, (int(channel_id),), False)])
+
+    # Change stamps. data_version only moves for commits made by other
+    # connections, so our own writes are counted in _local_versions.
+    def stamp(self, name):
+        version = self._query("PRAGMA data_version")[0][0]
+        return (version, self._local_versions.get(name, 0))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+JOURNAL_SNAPSHOT = "snapshot.json"
+JOURNAL_LOG = "journal.log"
+
+# Append-only journal plus a snapshot, everything is served from memory.
+#
+# Each mutation appends one small JSON line per changed record to the log,
+# so a write costs O(change) instead of rewriting a whole document. Writers
+# wait for their records to be fsynced, but one fsync covers every record
+# appended before it (group commit), so concurrent writers share the cost.
+# Once compact_every records have piled up the state is written to a new
+# snapshot and the log starts over. On startup the snapshot is loaded and
+# the log replayed on top of it; a torn last line from a crash is ignored.
+class JournalStorage:
+    def __init__(self, directory=JOURNAL_DIR, compact_every=1000):
+        self.directory = directory
+        self.compact_every = compact_every
+        self.snapshot_path = os.path.join(directory, JOURNAL_SNAPSHOT)
+        self.log_path = os.path.join(directory, JOURNAL_LOG)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._guilds = {}
+        self._staff = []
+        self._vips = []
+        self._appeals = {}
+        self._versions = {}  # "staff"/"vips" -> number of writes
+        self._seq = 0  # sequence number of the last record written
+        self._flushed_seq = 0  # sequence number of the last record handed to the OS
+        self._synced_seq = 0  # sequence number of the last record known to be on disk
+        self._log_records = 0  # records in the log since the last snapshot
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()
+
+        self._recover()
+        self._log = open(self.log_path, 'a')
+
+    # Recovery
+    def _recover(self):
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        if snapshot:
+            self._guilds = snapshot.get("guilds", {})
+            self._staff = snapshot.get("staff", [])
+            self._vips = snapshot.get("vips", [])
+            self._appeals = snapshot.get("appeals", {})
+            self._seq = snapshot.get("seq", 0)
+
+        if not os.path.exists(self.log_path):
+            return
+        valid_bytes = 0
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break  # torn write at the end of the log
+                if not line.endswith(b"\n"):
+                    break
+                valid_bytes += len(line)
+                # Records already folded into the snapshot are skipped
+                if record["seq"] > self._seq:
+                    self._apply(record)
+                    self._seq = record["seq"]
+                self._log_records += 1
+        # Cut off the torn tail so new records don't land after garbage
+        if valid_bytes != os.path.getsize(self.log_path):
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        self._flushed_seq = self._synced_seq = self._seq
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "guild":
+            self._guilds[record["id"]] = record["data"]
+        elif op == "guild_delete":
+            self._guilds.pop(record["id"], None)
+        elif op in ("staff", "vips"):
+            self._set_list(op, record["data"])
+        elif op in ("staff_add", "vips_add"):
+            members = self._list(op[:-4])
+            if record["id"] not in members:
+                members.append(record["id"])
+        elif op in ("staff_remove", "vips_remove"):
+            members = self._list(op[:-7])
+            if record["id"] in members:
+                members.remove(record["id"])
+        elif op == "appeal":
+            self._appeals[record["id"]] = record["data"]
+        elif op == "appeal_remove":
+            self._appeals.pop(record["id"], None)
+
+    def _list(self, name):
+        return self._staff if name == "staff" else self._vips
+
+    def _set_list(self, name, user_ids):
+        if name == "staff":
+            self._staff = list(user_ids)
+        else:
+            self._vips = list(user_ids)
+
+    # Writing
+    def _append(self, records, when=None, bump=None):
+        # records: [{"op": ..., "id": ..., "data": ...}], applied and logged as one unit.
+        # when() is checked under the lock, nothing is written when it returns False.
+        # The fsync happens after the lock is released, so other writers can join the group commit.
+        with self._lock:
+            if when is not None and not when():
+                return False
+            lines = []
+            for record in records:
+                self._seq += 1
+                record["seq"] = self._seq
+                self._apply(record)
+                lines.append(json.dumps(record, separators=(",", ":")))
+            self._log.write("\n".join(lines) + "\n")
+            self._log.flush()
+            self._log_records += len(records)
+            self._flushed_seq = seq = self._seq
+            if bump is not None:
+                self._bump(bump)
+        self._sync(seq)
+        if self._log_records >= self.compact_every:
+            self.compact()
+        return True
+
+    def _sync(self, seq):
+        with self._sync_lock:
+            # Someone else's fsync may already have covered our records
+            if self._synced_seq >= seq:
+                return
+            # Not taking self._lock here, writers hold it while they wait for us
+            target = self._flushed_seq
+            os.fsync(self._log.fileno())
+            self._synced_seq = target
+
+    def compact(self):
+        with self._lock, self._sync_lock:
+            snapshot = {
+                "seq": self._seq,
+                "guilds": self._guilds,
+                "staff": self._staff,
+                "vips": self._vips,
+                "appeals": self._appeals,
+            }
+            write_json_atomic(self.snapshot_path, snapshot, indent=None)
+            # The snapshot now holds every record, the log can start over
+            self._log.close()
+            self._log = open(self.log_path, 'w')
+            self._log_records = 0
+            self._flushed_seq = self._synced_seq = self._seq
+
+    def _bump(self, name):
+        self._versions[name] = self._versions.get(name, 0) + 1
+
+    # Guild settings
+    def load_guild(self, guild_id):
+        with self._lock:
+            settings = self._guilds.get(str(guild_id))
+            return dict(settings) if settings is not None else None
+
+    def save_guilds(self, batch):
+        if not batch:
+            return
+        self._append([{"op": "guild", "id": str(guild_id), "data": settings} for guild_id, settings in batch.items()])
+
+    def delete_guild(self, guild_id):
+        self._append([{"op": "guild_delete", "id": str(guild_id)}], when=lambda: str(guild_id) in self._guilds)
+
+    def list_guilds(self):
+        with self._lock:
+            return list(self._guilds)
+
+    # Staff
+    def load_staff(self):
+        with self._lock:
+            return list(self._staff)
+
+    def save_staff(self, user_ids):
+        self._append([{"op": "staff", "data": list(user_ids)}], bump="staff")
+
+    def add_staff(self, user_id):
+        return self._append([{"op": "staff_add", "id": user_id}], when=lambda: user_id not in self._staff, bump="staff")
+
+    def remove_staff(self, user_id):
+        return self._append([{"op": "staff_remove", "id": user_id}], when=lambda: user_id in self._staff, bump="staff")
+
+    # VIPs
+    def load_vips(self):
+        with self._lock:
+            return list(self._vips)
+
+    def save_vips(self, user_ids):
+        self._append([{"op": "vips", "data": list(user_ids)}], bump="vips")
+
+    def add_vip(self, user_id):
+        return self._append([{"op": "vips_add", "id": user_id}], when=lambda: user_id not in self._vips, bump="vips")
+
+    def remove_vip(self, user_id):
+        return self._append([{"op": "vips_remove", "id": user_id}], when=lambda: user_id in self._vips, bump="vips")
+
+    # Appeals
+    def load_appeals(self):
+        with self._lock:
+            return dict(self._appeals)
+
+    def save_appeal(self, channel_id, user_id):
+        self._append([{"op": "appeal", "id": str(channel_id), "data": str(user_id)}])
+
+    def remove_appeal(self, channel_id):
+        self._append([{"op": "appeal_remove", "id": str(channel_id)}], when=lambda: str(channel_id) in self._appeals)
+
+    # Change stamps, nothing outside this process writes the journal
+    def stamp(self, name):
+        return self._versions.get(name, 0)
+
+    def close(self):
+        with self._lock:
+            if self._log.closed:
+                return
+            if self._log_records:
+                self.compact()
+            self._log.close()
+
+# Function to pick the storage backend from the STORAGE_BACKEND setting
+def create_storage(backend=None):
+    backend = (backend or os.getenv("STORAGE_BACKEND", "json")).lower()
+    if backend == "json":
+        return JsonStorage()
+    if backend == "sqlite":
+        return SqliteStorage(os.getenv("SQLITE_PATH", SQLITE_PATH))
+    if backend == "journal":
+        return JournalStorage(os.getenv("JOURNAL_DIR", JOURNAL_DIR), compact_every=int(os.getenv("JOURNAL_COMPACT_EVERY", "1000")))
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+# Function to copy everything from one backend into another, used once when switching backends
+def migrate_storage(source, target):
+    counts = {}
+
+    guild_ids = source.list_guilds()
+    batch = {}
+    for guild_id in guild_ids:
+        if not guild_id.isdigit():
+            continue
+        settings = source.load_guild(guild_id)
+        if settings is not None:
+            batch[guild_id] = settings
+    target.save_guilds(batch)
+    counts["guilds"] = len(batch)
+
+    staff = source.load_staff()
+    target.save_staff(staff)
+    counts["staff"] = len(staff)
+
+    vips = source.load_vips()
+    target.save_vips(vips)
+    counts["vips"] = len(vips)
+
+    appeals = source.load_appeals()
+    for channel_id, user_id in appeals.items():
+        target.save_appeal(channel_id, user_id)
+    counts["appeals"] = len(appeals)
+
+    return counts
+
+# One-shot migration from the JSON layout:
+#   python src/storage.py migrate [sqlite path]
+#   python src/storage.py migrate-journal [journal dir]
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("migrate", "migrate-journal"):
+        print("Usage: python src/storage.py migrate [sqlite path] | migrate-journal [journal dir]")
+        sys.exit(1)
+
+    if sys.argv[1] == "migrate-journal":
+        target_path = sys.argv[2] if len(sys.argv) > 2 else JOURNAL_DIR
+        target = JournalStorage(target_path)
+    else:
+        target_path = sys.argv[2] if len(sys.argv) > 2 else SQLITE_PATH
+        target = SqliteStorage(target_path)
+    counts = migrate_storage(JsonStorage(), target)
+    target.close()
+    print(f"Migrated {counts['guilds']} guilds, {counts['staff']} staff, {counts['vips']} VIPs and {counts['appeals']} appeals into {target_path}")
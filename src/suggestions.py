@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+import time
+
+SUGGESTIONS_PATH = "database/suggestions.db"
+
+# Reactions the suggest command adds, mapped to the vote they count as
+UPVOTE = "✅"
+DOWNVOTE = "⛔"
+VOTE_EMOJIS = {UPVOTE: 1, DOWNVOTE: -1}
+
+OPEN = "open"
+STATUSES = (OPEN, "approved", "denied", "implemented")
+
+SUGGESTIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS suggestions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    message_id INTEGER UNIQUE,
+    author_id INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    upvotes INTEGER NOT NULL DEFAULT 0,
+    downvotes INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suggestion_votes (
+    message_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    vote INTEGER NOT NULL,
+    PRIMARY KEY (message_id, user_id, vote)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS suggestions_guild_status ON suggestions (guild_id, status, created_at);
+CREATE INDEX IF NOT EXISTS suggestions_guild_score ON suggestions (guild_id, status, (upvotes - downvotes));
+"""
+
+SQL_CREATE = "INSERT INTO suggestions (guild_id, channel_id, author_id, content, created_at) VALUES (?, ?, ?, ?, ?)"
+SQL_ATTACH = "UPDATE suggestions SET message_id = ? WHERE id = ?"
+SQL_DELETE = "DELETE FROM suggestions WHERE id = ?"
+SQL_GET = "SELECT * FROM suggestions WHERE guild_id = ? AND id = ?"
+SQL_SET_STATUS = "UPDATE suggestions SET status = ? WHERE guild_id = ? AND id = ?"
+# Only votes on a known suggestion message are stored, anything else inserts nothing
+SQL_ADD_VOTE = "INSERT OR IGNORE INTO suggestion_votes (message_id, user_id, vote) SELECT message_id, ?, ? FROM suggestions WHERE message_id = ?"
+SQL_REMOVE_VOTE = "DELETE FROM suggestion_votes WHERE message_id = ? AND user_id = ? AND vote = ?"
+SQL_COUNT_UP = "UPDATE suggestions SET upvotes = upvotes + ? WHERE message_id = ?"
+SQL_COUNT_DOWN = "UPDATE suggestions SET downvotes = downvotes + ? WHERE message_id = ?"
+SQL_TOP = "SELECT * FROM suggestions WHERE guild_id = ? AND status = ? ORDER BY (upvotes - downvotes) DESC LIMIT ?"
+SQL_OPEN = "SELECT * FROM suggestions WHERE guild_id = ? AND status = ? ORDER BY created_at DESC LIMIT ?"
+
+# Suggestions with their vote tallies, kept in their own SQLite database.
+#
+# Counts are maintained from raw reaction events as they arrive, so reading
+# them never touches Discord. Every (message, user, vote) is stored once,
+# which makes replayed or duplicate gateway events harmless.
+class SuggestionStore:
+    def __init__(self, path=SUGGESTIONS_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SUGGESTIONS_SCHEMA)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    # The ID goes in the embed, so the row exists before the message does
+    def create(self, guild_id, channel_id, author_id, content):
+        return self._execute(SQL_CREATE, (int(guild_id), int(channel_id), int(author_id), content, time.time())).lastrowid
+
+    def attach_message(self, suggestion_id, message_id):
+        self._execute(SQL_ATTACH, (int(message_id), suggestion_id))
+
+    def delete(self, suggestion_id):
+        self._execute(SQL_DELETE, (suggestion_id,))
+
+    def get(self, guild_id, suggestion_id):
+        rows = self._query(SQL_GET, (int(guild_id), suggestion_id))
+        return rows[0] if rows else None
+
+    def set_status(self, guild_id, suggestion_id, status):
+        if status not in STATUSES:
+            raise ValueError(f"Unknown suggestion status: {status}")
+        return self._execute(SQL_SET_STATUS, (status, int(guild_id), suggestion_id)).rowcount > 0
+
+    # Function to apply one reaction add or remove, returns whether a tally changed
+    def record_vote(self, message_id, user_id, emoji, added):
+        vote = VOTE_EMOJIS.get(emoji)
+        if vote is None:
+            return False
+        count_sql = SQL_COUNT_UP if vote > 0 else SQL_COUNT_DOWN
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if added:
+                    changed = self._conn.execute(SQL_ADD_VOTE, (int(user_id), vote, int(message_id))).rowcount
+                else:
+                    changed = self._conn.execute(SQL_REMOVE_VOTE, (int(message_id), int(user_id), vote)).rowcount
+                if changed:
+                    self._conn.execute(count_sql, (1 if added else -1, int(message_id)))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bool(changed)
+
+    def top(self, guild_id, limit=10, status=OPEN):
+        return self._query(SQL_TOP, (int(guild_id), status, limit))
+
+    def open(self, guild_id, limit=10):
+        return self._query(SQL_OPEN, (int(guild_id), OPEN, limit))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
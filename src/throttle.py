@@ -0,0 +1,104 @@
+import time
+
+from metrics import registry as metrics
+
+metrics.describe("throttle_rejections_total", "Requests turned away by a throttle, by command and the scope that was empty")
+metrics.describe("throttle_buckets", "Token buckets currently kept by the throttle")
+
+class Limit:
+    def __init__(self, scope, rate, per):
+        if scope not in ("user", "guild", "global"):
+            raise ValueError(f"Unknown throttle scope {scope}")
+        self.scope = scope  # whose requests share a bucket: one user, one guild or everyone
+        self.rate = rate  # requests allowed in a burst
+        self.per = per  # seconds to refill the whole burst
+
+# What each user-triggered action may cost. The user bucket is checked
+# first, so a user who is turned away never uses up their guild's tokens.
+THROTTLES = {
+    "suggest": (Limit("user", 3, 60), Limit("guild", 20, 60), Limit("global", 120, 60)),
+    "ping": (Limit("user", 5, 30), Limit("guild", 30, 60)),
+    "help": (Limit("user", 5, 30), Limit("guild", 30, 60)),
+    # Every appeal creates a channel
+    "appeal": (Limit("user", 1, 600), Limit("guild", 5, 600), Limit("global", 30, 600)),
+}
+
+class TokenBucket:
+    def __init__(self, rate, per, now):
+        self.capacity = rate
+        self.refill = rate / per  # tokens per second
+        self.tokens = float(rate)
+        self.updated = now
+        self.notified = False  # the owner was told to slow down since the bucket last granted
+
+    def level(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill)
+        self.updated = now
+        return self.tokens
+
+    def retry_after(self, now):
+        return max(1 - self.level(now), 0) / self.refill
+
+class Rejection:
+    def __init__(self, command, scope, retry_after, notify):
+        self.command = command
+        self.scope = scope
+        self.retry_after = retry_after
+        self.notify = notify  # False when the user was already told, stay silent then
+
+# In-memory token buckets for the actions users can trigger, per user, per
+# guild and per action, as configured in THROTTLES. Everything runs on the
+# event loop, a check is a few dict lookups.
+#
+# A request takes a token from each of its buckets, or from none of them
+# when one is empty. Only the first rejection until a user's bucket grants
+# again asks to be answered, later ones are dropped without a reply.
+# sweep() forgets buckets that have refilled, they behave like new ones.
+class Throttler:
+    def __init__(self, limits=THROTTLES):
+        self.limits = limits
+        self._buckets = {}  # (command, scope, id) -> TokenBucket
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _bucket(self, command, limit, owner_id, now):
+        key = (command, limit.scope, owner_id)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(limit.rate, limit.per, now)
+        return bucket
+
+    # Returns None when the request may go ahead, a Rejection otherwise
+    def hit(self, command, user_id, guild_id=None):
+        limits = self.limits.get(command)
+        if not limits:
+            return None
+        now = time.monotonic()
+        owners = {"user": user_id, "guild": guild_id, "global": 0}
+        buckets = []
+        for limit in limits:
+            owner_id = owners[limit.scope]
+            if owner_id is None:
+                continue  # no guild bucket in DMs
+            bucket = self._bucket(command, limit, owner_id, now)
+            if bucket.level(now) < 1:
+                metrics.inc("throttle_rejections_total", command=command, scope=limit.scope)
+                # The user's own bucket remembers the notice, it's the one the user can wait out
+                user_bucket = buckets[0] if buckets and limits[0].scope == "user" else bucket
+                notify = not user_bucket.notified
+                user_bucket.notified = True
+                return Rejection(command, limit.scope, bucket.retry_after(now), notify)
+            buckets.append(bucket)
+        for bucket in buckets:
+            bucket.tokens -= 1
+            bucket.notified = False
+        return None
+
+    def sweep(self):
+        now = time.monotonic()
+        idle = [key for key, bucket in self._buckets.items() if bucket.level(now) >= bucket.capacity]
+        for key in idle:
+            del self._buckets[key]
+        metrics.set("throttle_buckets", len(self._buckets))
+        return len(idle)
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import re
+import sys
+import traceback
+
+from aiohttp import web
+
+# A full commit SHA, GitHub sends forty zeros as "after" when the branch is deleted
+COMMIT_SHA = re.compile(r"[0-9a-f]{40}")
+NULL_SHA = "0" * 40
+
+# Every update source (webhook, local git watcher, slow polling, !checkupdate)
+# reports the newest commit SHA here. The pipeline remembers the SHA it is
+# running and only hands new ones to apply_update, one at a time.
+class UpdatePipeline:
+    def __init__(self, apply_update, local_sha=None):
+        self.apply_update = apply_update  # coroutine taking (sha, source)
+        self.local_sha = local_sha  # () -> SHA the checkout is at, or None if it can't be read
+        self.current_sha = None
+        self._lock = asyncio.Lock()
+
+    def seed(self, sha):
+        # Remember the running commit without applying anything, the checkout's own commit wins
+        if self.current_sha is None:
+            local_sha = self.local_sha() if self.local_sha is not None else None
+            self.current_sha = local_sha or sha
+
+    async def trigger(self, sha, source):
+        async with self._lock:
+            if not sha or sha == self.current_sha:
+                return False
+            print(f"New commit {sha[:7]} detected via {source}.")
+            await self.apply_update(sha, source)
+            # A push can be announced before the checkout has it, the commit is only
+            # marked as running once the checkout is there and is applied again otherwise
+            local_sha = self.local_sha() if self.local_sha is not None else None
+            if local_sha is not None and local_sha != sha:
+                print(f"The checkout is still at {local_sha[:7]}, {sha[:7]} will be applied again on the next trigger.")
+                return False
+            self.current_sha = sha
+            return True
+
+# Function to check a GitHub webhook signature (X-Hub-Signature-256)
+def verify_signature(secret, body, signature):
+    if not secret or not signature or not signature.startswith("sha256="):
+        return False
+    expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+# Small embedded HTTP listener for GitHub push webhooks
+class WebhookListener:
+    def __init__(self, pipeline, secret, branch="main", host="0.0.0.0", port=8080, path="/github"):
+        self.pipeline = pipeline
+        self.secret = secret
+        self.branch = branch
+        self.host = host
+        self.port = port
+        self.path = path
+        self._runner = None
+        self._updates = set()  # update tasks still running, so they aren't garbage collected
+
+    async def handle(self, request):
+        body = await request.read()
+        if not verify_signature(self.secret, body, request.headers.get("X-Hub-Signature-256")):
+            return web.Response(status=401, text="Invalid signature")
+
+        event = request.headers.get("X-GitHub-Event")
+        if event == "ping":
+            return web.Response(text="pong")
+        if event != "push":
+            return web.Response(status=202, text="Ignored event")
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return web.Response(status=400, text="Invalid payload")
+        if not isinstance(payload, dict):
+            return web.Response(status=400, text="Invalid payload")
+
+        if payload.get("ref") != f"refs/heads/{self.branch}":
+            return web.Response(status=202, text="Ignored branch")
+
+        sha = payload.get("after")
+        if payload.get("deleted") or sha == NULL_SHA:
+            return web.Response(status=202, text="Ignored branch deletion")
+        if not isinstance(sha, str) or not COMMIT_SHA.fullmatch(sha):
+            return web.Response(status=400, text="Missing or invalid commit SHA")
+
+        # Answer GitHub before the update runs, it may restart the process
+        task = asyncio.create_task(self.pipeline.trigger(sha, "webhook"))
+        self._updates.add(task)
+        task.add_done_callback(self._update_done)
+        return web.Response(status=202, text="Update queued")
+
+    def _update_done(self, task):
+        self._updates.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            error = task.exception()
+            print("Update from a GitHub webhook failed:", file=sys.stderr)
+            traceback.print_exception(type(error), error, error.__traceback__, file=sys.stderr)
+
+    @property
+    def running(self):
+        return self._runner is not None
+
+    async def start(self):
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_post(self.path, self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"Listening for GitHub webhooks on {self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+# Function to read the commit a branch of a local checkout points at, None if it has none
+def read_branch_sha(git_dir, branch):
+    ref_path = os.path.join(git_dir, "refs", "heads", branch)
+    packed_path = os.path.join(git_dir, "packed-refs")
+    if os.path.exists(ref_path):
+        with open(ref_path, 'r') as f:
+            return f.read().strip()
+    if os.path.exists(packed_path):
+        ref_name = f"refs/heads/{branch}"
+        with open(packed_path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1] == ref_name:
+                    return parts[0]
+    return None
+
+# Offline alternative to the webhook: watches a local checkout's branch ref.
+# Only the ref files are stat'ed on each check, they are read when they change.
+# The bot runs check() as a scheduler job every interval seconds.
+class GitRefWatcher:
+    def __init__(self, pipeline, git_dir, branch="main", interval=2):
+        self.pipeline = pipeline
+        self.git_dir = git_dir
+        self.branch = branch
+        self.interval = interval
+        self._stamp = None
+
+    def _ref_paths(self):
+        return os.path.join(self.git_dir, "refs", "heads", self.branch), os.path.join(self.git_dir, "packed-refs")
+
+    def _stat_stamp(self):
+        stamp = []
+        for path in self._ref_paths():
+            try:
+                stat = os.stat(path)
+                stamp.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def read_sha(self):
+        return read_branch_sha(self.git_dir, self.branch)
+
+    # Take the current ref as the running commit, call before the first check
+    def prime(self):
+        self._stamp = self._stat_stamp()
+        self.pipeline.seed(self.read_sha())
+
+    async def check(self):
+        stamp = self._stat_stamp()
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        sha = self.read_sha()
+        if sha:
+            await self.pipeline.trigger(sha, "git")